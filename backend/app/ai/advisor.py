@@ -41,7 +41,7 @@ class FinancialAdvisor:
                 self.ai_enabled = True
                 logger.info("Gemini AI инициализирован")
             except Exception as e:
-                logger.warning(f"Не удалось инициализировать Gemini AI: {e}")
+                logger.warning("Не удалось инициализировать Gemini AI: %s", e)
                 self.ai_enabled = False
         else:
             self.ai_enabled = False
@@ -85,12 +85,12 @@ class FinancialAdvisor:
             }
             
             self.analysis_history.append(analysis_result)
-            logger.info(f"Анализ завершен. Общий балл: {overall_score}/100")
+            logger.info("Анализ завершен. Общий балл: %s/100", overall_score)
             
             return analysis_result
             
         except Exception as e:
-            logger.error(f"Ошибка анализа финансов: {e}")
+            logger.error("Ошибка анализа финансов: %s", e)
             raise
     
     async def _analyze_income(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -244,7 +244,7 @@ class FinancialAdvisor:
                 }
                 
             except Exception as e:
-                logger.error(f"Ошибка получения AI рекомендаций: {e}")
+                logger.error("Ошибка получения AI рекомендаций: %s", e)
                 # Fallback к базовым рекомендациям
                 return {
                     "recommendations": [
@@ -5,12 +5,22 @@
 
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, date, timedelta
+import functools
 import statistics
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_iso_date(date_str: str) -> Optional[date]:
+    """Разбор ISO-даты с кэшем: у транзакций периода немного разных дат"""
+    try:
+        return datetime.fromisoformat(date_str).date()
+    except ValueError:
+        return None
+
+
 class FinancialAnalyzer:
     """
     Анализатор финансовых данных
@@ -40,7 +50,7 @@ class FinancialAnalyzer:
             Dict: Анализ трендов
         """
         try:
-            logger.info(f"Анализ трендов расходов за {period_days} дней...")
+            logger.info("Анализ трендов расходов за %s дней...", period_days)
             
             # Фильтруем расходы за период
             end_date = datetime.now().date()
@@ -86,7 +96,7 @@ class FinancialAnalyzer:
             return result
             
         except Exception as e:
-            logger.error(f"Ошибка анализа трендов: {e}")
+            logger.error("Ошибка анализа трендов: %s", e)
             return {"error": str(e)}
     
     async def _analyze_by_categories(self, transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -226,7 +236,7 @@ class FinancialAnalyzer:
             Dict: Анализ доходов
         """
         try:
-            logger.info(f"Анализ трендов доходов за {period_days} дней...")
+            logger.info("Анализ трендов доходов за %s дней...", period_days)
             
             # Фильтруем доходы за период
             end_date = datetime.now().date()
@@ -272,7 +282,7 @@ class FinancialAnalyzer:
             return result
             
         except Exception as e:
-            logger.error(f"Ошибка анализа доходов: {e}")
+            logger.error("Ошибка анализа доходов: %s", e)
             return {"error": str(e)}
     
     async def _generate_income_insights(self, stats: Dict, sources: Dict) -> List[str]:
@@ -297,7 +307,7 @@ class FinancialAnalyzer:
         """Парсинг даты из строки"""
         try:
             if isinstance(date_str, str):
-                return datetime.fromisoformat(date_str).date()
+                return _parse_iso_date(date_str)
             elif isinstance(date_str, date):
                 return date_str
             return None
@@ -379,7 +389,7 @@ class FinancialAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"Ошибка расчета балла: {e}")
+            logger.error("Ошибка расчета балла: %s", e)
             return {"error": str(e)}
     
     def _get_grade(self, score: int) -> str:
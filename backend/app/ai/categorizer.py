@@ -3,13 +3,126 @@ AI система для автоматической категоризации
 Использует машинное обучение и правила для определения категорий
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 import re
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Правила категоризации по умолчанию (порядок категорий = приоритет)
+DEFAULT_CATEGORIES: Dict[str, Dict[str, List[str]]] = {
+    "Продукты": {
+        "keywords": ["grocery", "supermarket", "food", "restaurant", "cafe", "tim hortons", "mcdonald", "starbucks"],
+        "patterns": [r".*grocery.*", r".*supermarket.*", r".*food.*", r".*restaurant.*"]
+    },
+    "Транспорт": {
+        "keywords": ["uber", "lyft", "taxi", "gas", "fuel", "parking", "metro", "bus", "train"],
+        "patterns": [r".*uber.*", r".*lyft.*", r".*gas.*", r".*fuel.*"]
+    },
+    "Развлечения": {
+        "keywords": ["netflix", "spotify", "movie", "cinema", "theater", "game", "entertainment"],
+        "patterns": [r".*netflix.*", r".*spotify.*", r".*movie.*", r".*cinema.*"]
+    },
+    "Здоровье": {
+        "keywords": ["pharmacy", "doctor", "hospital", "medical", "health", "drugstore"],
+        "patterns": [r".*pharmacy.*", r".*medical.*", r".*health.*"]
+    },
+    "Образование": {
+        "keywords": ["university", "college", "school", "course", "education", "book", "library"],
+        "patterns": [r".*university.*", r".*college.*", r".*school.*"]
+    },
+    "Покупки": {
+        "keywords": ["amazon", "shop", "store", "mall", "retail", "purchase", "buy"],
+        "patterns": [r".*amazon.*", r".*shop.*", r".*store.*"]
+    },
+    "Доходы": {
+        "keywords": ["salary", "wage", "income", "deposit", "refund", "bonus"],
+        "patterns": [r".*salary.*", r".*wage.*", r".*deposit.*"]
+    },
+    "Инвестиции": {
+        "keywords": ["investment", "stock", "bond", "dividend", "trading", "broker"],
+        "patterns": [r".*investment.*", r".*stock.*", r".*dividend.*"]
+    },
+    "Коммунальные услуги": {
+        "keywords": ["electric", "water", "gas", "utility", "internet", "phone", "cable"],
+        "patterns": [r".*electric.*", r".*water.*", r".*utility.*"]
+    },
+    "Другое": {
+        "keywords": [],
+        "patterns": []
+    }
+}
+
+
+# Выражение категории: одно объединенное или список отдельных выражений
+_Matcher = Union[re.Pattern, Tuple[re.Pattern, ...]]
+
+
+def _compile_patterns(patterns: List[str]) -> Optional[_Matcher]:
+    """
+    Компиляция пользовательских паттернов категории
+    
+    Каждый паттерн сначала компилируется отдельно (ошибка re.error
+    пробрасывается). Объединение в одно выражение меняет смысл паттернов
+    с группами (сдвигаются номера обратных ссылок) и ломает глобальные
+    флаги вроде (?i), поэтому в таких случаях паттерны проверяются по одному.
+    """
+    if not patterns:
+        return None
+    
+    compiled = tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)
+    if len(compiled) == 1:
+        return compiled[0]
+    if any(matcher.groups for matcher in compiled):
+        return compiled
+    
+    try:
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+    except re.error:
+        return compiled
+
+
+def _matches(matcher: Optional[_Matcher], description: str) -> bool:
+    """Проверка описания выражением категории"""
+    if matcher is None:
+        return False
+    if isinstance(matcher, tuple):
+        return any(pattern.search(description) for pattern in matcher)
+    return matcher.search(description) is not None
+
+
+def _compile_category_matchers(
+    categories: Dict[str, Dict[str, List[str]]]
+) -> Tuple[Dict[str, Optional[_Matcher]], Dict[str, Optional[_Matcher]]]:
+    """
+    Компиляция правил категорий в регулярные выражения
+    
+    Для каждой категории ключевые слова (и, где это не меняет их смысл,
+    паттерны) объединяются в одно выражение, поэтому описание проверяется
+    одним проходом на категорию. Порядок категорий (приоритет) сохраняется.
+    
+    Returns:
+        Tuple: (категория -> выражение ключевых слов, категория -> выражение паттернов)
+    """
+    keyword_matchers: Dict[str, Optional[_Matcher]] = {}
+    pattern_matchers: Dict[str, Optional[_Matcher]] = {}
+    
+    for category, data in categories.items():
+        keywords = data.get("keywords", [])
+        keyword_matchers[category] = (
+            re.compile("|".join(re.escape(keyword.lower()) for keyword in keywords)) if keywords else None
+        )
+        pattern_matchers[category] = _compile_patterns(data.get("patterns", []))
+    
+    return keyword_matchers, pattern_matchers
+
+
+_DEFAULT_KEYWORD_MATCHERS, _DEFAULT_PATTERN_MATCHERS = _compile_category_matchers(DEFAULT_CATEGORIES)
+
+# Максимум описаний в кэше категорий одного категоризатора
+_CATEGORY_CACHE_SIZE = 8192
+
 
 class TransactionCategorizer:
     """
@@ -23,51 +136,29 @@ class TransactionCategorizer:
     
     def __init__(self):
         """Инициализация категоризатора"""
-        self.categories = {
-            "Продукты": {
-                "keywords": ["grocery", "supermarket", "food", "restaurant", "cafe", "tim hortons", "mcdonald", "starbucks"],
-                "patterns": [r".*grocery.*", r".*supermarket.*", r".*food.*", r".*restaurant.*"]
-            },
-            "Транспорт": {
-                "keywords": ["uber", "lyft", "taxi", "gas", "fuel", "parking", "metro", "bus", "train"],
-                "patterns": [r".*uber.*", r".*lyft.*", r".*gas.*", r".*fuel.*"]
-            },
-            "Развлечения": {
-                "keywords": ["netflix", "spotify", "movie", "cinema", "theater", "game", "entertainment"],
-                "patterns": [r".*netflix.*", r".*spotify.*", r".*movie.*", r".*cinema.*"]
-            },
-            "Здоровье": {
-                "keywords": ["pharmacy", "doctor", "hospital", "medical", "health", "drugstore"],
-                "patterns": [r".*pharmacy.*", r".*medical.*", r".*health.*"]
-            },
-            "Образование": {
-                "keywords": ["university", "college", "school", "course", "education", "book", "library"],
-                "patterns": [r".*university.*", r".*college.*", r".*school.*"]
-            },
-            "Покупки": {
-                "keywords": ["amazon", "shop", "store", "mall", "retail", "purchase", "buy"],
-                "patterns": [r".*amazon.*", r".*shop.*", r".*store.*"]
-            },
-            "Доходы": {
-                "keywords": ["salary", "wage", "income", "deposit", "refund", "bonus"],
-                "patterns": [r".*salary.*", r".*wage.*", r".*deposit.*"]
-            },
-            "Инвестиции": {
-                "keywords": ["investment", "stock", "bond", "dividend", "trading", "broker"],
-                "patterns": [r".*investment.*", r".*stock.*", r".*dividend.*"]
-            },
-            "Коммунальные услуги": {
-                "keywords": ["electric", "water", "gas", "utility", "internet", "phone", "cable"],
-                "patterns": [r".*electric.*", r".*water.*", r".*utility.*"]
-            },
-            "Другое": {
-                "keywords": [],
-                "patterns": []
-            }
-        }
+        # Копия правил по умолчанию: add_custom_category меняет только этот экземпляр
+        self.categories = {name: dict(rules) for name, rules in DEFAULT_CATEGORIES.items()}
         
         self.user_preferences = {}  # Пользовательские предпочтения
         self.learning_data = []     # Данные для обучения
+        
+        # Правила по умолчанию скомпилированы при импорте модуля
+        self._keyword_matchers = dict(_DEFAULT_KEYWORD_MATCHERS)
+        self._pattern_matchers = dict(_DEFAULT_PATTERN_MATCHERS)
+        
+        # Описание -> категория: у повторяющихся мерчантов одно и то же описание
+        self._category_cache: Dict[str, str] = {}
+    
+    def _compile_matchers(self, categories: Dict[str, Dict[str, List[str]]]) -> None:
+        """
+        Замена правил категорий
+        
+        Правила сначала компилируются: при ошибке в паттерне исключение
+        пробрасывается, а текущие категории и выражения не меняются.
+        """
+        self._keyword_matchers, self._pattern_matchers = _compile_category_matchers(categories)
+        self.categories = categories
+        self._category_cache.clear()
     
     async def categorize_transaction(self, transaction: Dict[str, Any]) -> str:
         """
@@ -80,46 +171,49 @@ class TransactionCategorizer:
             str: Определенная категория
         """
         try:
-            description = transaction.get("description", "").lower()
-            amount = transaction.get("amount", 0)
-            
-            # Если транзакция положительная, скорее всего это доход
-            if amount > 0:
-                return "Доходы"
-            
-            # Поиск по ключевым словам
-            category = await self._find_category_by_keywords(description)
-            if category:
-                return category
-            
-            # Поиск по паттернам
-            category = await self._find_category_by_patterns(description)
-            if category:
-                return category
-            
-            # Если ничего не найдено, возвращаем "Другое"
-            return "Другое"
+            return await self._categorize_description(
+                transaction.get("description", "").lower(), transaction.get("amount", 0)
+            )
             
         except Exception as e:
-            logger.error(f"Ошибка категоризации транзакции: {e}")
+            logger.error("Ошибка категоризации транзакции: %s", e)
             return "Другое"
     
+    async def _categorize_description(self, description: str, amount: float) -> str:
+        """Категория по описанию (уже в нижнем регистре) и сумме"""
+        # Если транзакция положительная, скорее всего это доход
+        if amount > 0:
+            return "Доходы"
+        
+        category = self._category_cache.get(description)
+        if category is not None:
+            return category
+        
+        # Поиск по ключевым словам, затем по паттернам;
+        # если ничего не найдено, возвращаем "Другое"
+        category = (
+            await self._find_category_by_keywords(description)
+            or await self._find_category_by_patterns(description)
+            or "Другое"
+        )
+        
+        if len(self._category_cache) >= _CATEGORY_CACHE_SIZE:
+            self._category_cache.clear()
+        self._category_cache[description] = category
+        return category
+    
     async def _find_category_by_keywords(self, description: str) -> Optional[str]:
         """Поиск категории по ключевым словам"""
-        for category, data in self.categories.items():
-            keywords = data.get("keywords", [])
-            for keyword in keywords:
-                if keyword.lower() in description:
-                    return category
+        for category, matcher in self._keyword_matchers.items():
+            if _matches(matcher, description):
+                return category
         return None
     
     async def _find_category_by_patterns(self, description: str) -> Optional[str]:
         """Поиск категории по регулярным выражениям"""
-        for category, data in self.categories.items():
-            patterns = data.get("patterns", [])
-            for pattern in patterns:
-                if re.search(pattern, description, re.IGNORECASE):
-                    return category
+        for category, matcher in self._pattern_matchers.items():
+            if _matches(matcher, description):
+                return category
         return None
     
     async def categorize_batch(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -141,51 +235,49 @@ class TransactionCategorizer:
                     categorized_transactions.append(transaction)
                     continue
                 
-                # Определяем категорию
-                category = await self.categorize_transaction(transaction)
+                # Определяем категорию (описание приводится к нижнему регистру один раз)
+                description = transaction.get("description", "").lower()
+                category = await self._categorize_description(description, transaction.get("amount", 0))
                 transaction["category"] = category
-                transaction["category_confidence"] = await self._calculate_confidence(transaction, category)
+                transaction["category_confidence"] = await self._calculate_confidence(
+                    transaction, category, description
+                )
                 
                 categorized_transactions.append(transaction)
             
-            logger.info(f"Категоризировано {len(transactions)} транзакций")
+            logger.info("Категоризировано %s транзакций", len(transactions))
             return categorized_transactions
             
         except Exception as e:
-            logger.error(f"Ошибка пакетной категоризации: {e}")
+            logger.error("Ошибка пакетной категоризации: %s", e)
             return transactions
     
-    async def _calculate_confidence(self, transaction: Dict[str, Any], category: str) -> float:
+    async def _calculate_confidence(self, transaction: Dict[str, Any], category: str,
+                                    description: Optional[str] = None) -> float:
         """
         Расчет уверенности в категоризации
         
         Args:
             transaction: Транзакция
             category: Определенная категория
+            description: Описание в нижнем регистре, если уже вычислено
             
         Returns:
             float: Уверенность от 0 до 1
         """
-        description = transaction.get("description", "").lower()
+        if description is None:
+            description = transaction.get("description", "").lower()
         amount = transaction.get("amount", 0)
         
         confidence = 0.5  # Базовая уверенность
         
         # Бонус за точное совпадение ключевых слов
-        if category in self.categories:
-            keywords = self.categories[category].get("keywords", [])
-            for keyword in keywords:
-                if keyword.lower() in description:
-                    confidence += 0.2
-                    break
+        if _matches(self._keyword_matchers.get(category), description):
+            confidence += 0.2
         
         # Бонус за паттерны
-        if category in self.categories:
-            patterns = self.categories[category].get("patterns", [])
-            for pattern in patterns:
-                if re.search(pattern, description, re.IGNORECASE):
-                    confidence += 0.3
-                    break
+        if _matches(self._pattern_matchers.get(category), description):
+            confidence += 0.3
         
         # Бонус за логику (доходы для положительных сумм)
         if category == "Доходы" and amount > 0:
@@ -216,10 +308,10 @@ class TransactionCategorizer:
             # Здесь можно добавить логику машинного обучения
             # Пока что просто сохраняем данные
             
-            logger.info(f"Сохранена обратная связь для транзакции {transaction_id}: {correct_category}")
+            logger.info("Сохранена обратная связь для транзакции %s: %s", transaction_id, correct_category)
             
         except Exception as e:
-            logger.error(f"Ошибка обучения: {e}")
+            logger.error("Ошибка обучения: %s", e)
     
     async def get_category_statistics(self) -> Dict[str, Any]:
         """
@@ -243,7 +335,7 @@ class TransactionCategorizer:
             }
             
         except Exception as e:
-            logger.error(f"Ошибка получения статистики: {e}")
+            logger.error("Ошибка получения статистики: %s", e)
             return {}
     
     def add_custom_category(self, category_name: str, keywords: List[str], patterns: List[str]) -> None:
@@ -256,15 +348,18 @@ class TransactionCategorizer:
             patterns: Регулярные выражения
         """
         try:
-            self.categories[category_name] = {
-                "keywords": keywords,
-                "patterns": patterns
-            }
+            self._compile_matchers({
+                **self.categories,
+                category_name: {
+                    "keywords": keywords,
+                    "patterns": patterns
+                }
+            })
             
-            logger.info(f"Добавлена пользовательская категория: {category_name}")
+            logger.info("Добавлена пользовательская категория: %s", category_name)
             
         except Exception as e:
-            logger.error(f"Ошибка добавления категории: {e}")
+            logger.error("Ошибка добавления категории: %s", e)
     
     def get_available_categories(self) -> List[str]:
         """Получение списка доступных категорий"""
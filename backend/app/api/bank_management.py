@@ -8,6 +8,7 @@ from typing import List, Dict, Any, Optional
 import asyncio
 import logging
 from datetime import datetime, date, timedelta
+from ..banks import gather_with_concurrency
 from ..banks.plaid_integration import PlaidBankConnector
 import os
 from dotenv import load_dotenv
@@ -19,6 +20,9 @@ load_dotenv()
 router = APIRouter(prefix="/api/banks", tags=["bank-management"])
 logger = logging.getLogger(__name__)
 
+# Максимум одновременных обновлений банков через Plaid
+PLAID_REFRESH_CONCURRENCY = 10
+
 class BankStatus(BaseModel):
     code: str
     name: str
@@ -88,18 +92,10 @@ class BankManager:
                         "item_id": bank.item_id,
                         "plaid_institution_id": bank.plaid_institution_id
                     }
-            logger.info(f"Loaded {len(self.banks)} banks from database.")
+            logger.info("Loaded %s banks from database.", len(self.banks))
         except Exception as e:
-            logger.error(f"Error loading banks from database: {e}")
+            logger.error("Error loading banks from database: %s", e)
 
-    async def _save_banks_to_cache(self):
-        """Сохраняем банки в кэш"""
-        try:
-            await self.cache_service.cache_data("banks", self.banks)
-            logger.info("Банки сохранены в кэш")
-        except Exception as e:
-            logger.warning(f"Не удалось сохранить банки в кэш: {e}")
-    
     async def check_bank_status(self, bank_key: str) -> BankStatus:
         """Проверяем статус конкретного банка по ключу (plaid_institution_id)"""
         if bank_key not in self.banks:
@@ -202,28 +198,26 @@ class BankManager:
                 accounts = await connector.get_accounts()
                 
                 # Отладочная информация
-                logger.info(f"Получено счетов для {bank_key}: {len(accounts)}")
+                logger.info("Получено счетов для %s: %s", bank_key, len(accounts))
                 for i, account in enumerate(accounts):
-                    logger.info(f"Счет {i+1}: {account.get('name', 'N/A')} ({account.get('type', 'N/A')})")
+                    logger.info("Счет %s: %s (%s)", i+1, account.get('name', 'N/A'), account.get('type', 'N/A'))
                 
                 # Проверяем, что accounts не пустой и содержит нужные поля
                 if not accounts:
                     return []
                 
+                # Время получения данных из Plaid - одно на весь ответ
+                current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                bank_name = bank_info['name']
+                
                 result = []
                 for account in accounts:
                     try:
                         # Преобразуем enum объекты в строки
-                        account_type = str(account.get('type', 'unknown'))
-                        account_subtype = str(account.get('subtype', 'unknown'))
-                        
-                        # Дополнительная проверка для enum объектов
-                        if hasattr(account.get('type'), 'value'):
-                            account_type = account.get('type').value
-                        if hasattr(account.get('subtype'), 'value'):
-                            account_subtype = account.get('subtype').value
-                        
-                        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                        raw_type = account.get('type', 'unknown')
+                        raw_subtype = account.get('subtype', 'unknown')
+                        account_type = raw_type.value if hasattr(raw_type, 'value') else str(raw_type)
+                        account_subtype = raw_subtype.value if hasattr(raw_subtype, 'value') else str(raw_subtype)
                         
                         result.append(BankAccount(
                             id=account.get('id', ''),
@@ -232,7 +226,7 @@ class BankManager:
                             subtype=account_subtype,
                             balance=float(account.get('current_balance', 0)),
                             currency=account.get('currency', 'CAD'),
-                            bank_name=bank_info['name'],  # Используем правильное имя банка
+                            bank_name=bank_name,  # Используем правильное имя банка
                             balance_type=account.get('balance_type'),
                             credit_limit=account.get('credit_limit'),
                             used_credit=account.get('used_credit'),
@@ -240,8 +234,8 @@ class BankManager:
                             last_updated=current_time  # Время получения данных из Plaid
                         ))
                     except Exception as account_error:
-                        logger.error(f"Ошибка обработки счета: {account_error}")
-                        logger.error(f"Account data: {account}")
+                        logger.error("Ошибка обработки счета: %s", account_error)
+                        logger.error("Account data: %s", account)
                         continue
                 
                 return result
@@ -251,7 +245,7 @@ class BankManager:
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Ошибка получения счетов для {bank_key}: {str(e)}")
+            logger.error("Ошибка получения счетов для %s: %s", bank_key, str(e))
             raise HTTPException(status_code=500, detail=f"Ошибка получения счетов: {str(e)}")
     
     async def get_bank_transactions(self, bank_key: str, account_id: str, days: int = 30) -> List[BankTransaction]:
@@ -391,9 +385,8 @@ class BankManager:
                         pass
                     
                     # Простая конвертация транзакций
-                    simple_transactions = []
-                    for transaction in transactions:
-                        simple_transaction = {
+                    simple_transactions = [
+                        {
                             "date": str(transaction.get('date', '')),
                             "name": str(transaction.get('name', '')),
                             "amount": str(transaction.get('amount', '0')),
@@ -402,7 +395,8 @@ class BankManager:
                             "transaction_type": str(transaction.get('transaction_type', '')),
                             "pending": str(transaction.get('pending', 'False'))
                         }
-                        simple_transactions.append(simple_transaction)
+                        for transaction in transactions
+                    ]
                     
                     account_analysis["transactions"] = simple_transactions
                     account_analysis["quality_metrics"]["total_transactions"] = len(transactions)
@@ -429,8 +423,9 @@ class BankManager:
                             
                             if latest_date:
                                 try:
-                                    latest_dt = datetime.strptime(latest_date, '%Y-%m-%d')
-                                    days_ago = (datetime.now() - latest_dt).days
+                                    # Из Plaid приходит date, из кэша - строка 'YYYY-MM-DD'
+                                    latest_dt = date.fromisoformat(str(latest_date)[:10])
+                                    days_ago = (date.today() - latest_dt).days
                                     
                                     # Для кредитных карт учитываем задержки обработки
                                     is_credit_card = account.get("type", "").lower() in ["credit", "credit_card"]
@@ -535,9 +530,9 @@ class BankManager:
                 "item_id": created_bank.item_id,
                 "plaid_institution_id": created_bank.plaid_institution_id
             }
-            logger.info(f"Bank {name} with institution_id {plaid_institution_id} was added/updated in the database.")
+            logger.info("Bank %s with institution_id %s was added/updated in the database.", name, plaid_institution_id)
         else:
-            logger.error(f"Failed to add/update bank {name} in the database.")
+            logger.error("Failed to add/update bank %s in the database.", name)
 
 # Создаем экземпляр менеджера
 bank_manager = BankManager()
@@ -549,7 +544,7 @@ async def get_all_banks_status():
     if not bank_manager.banks:
         await bank_manager._load_banks_from_db()
     tasks = [bank_manager.check_bank_status(bank_code) for bank_code in bank_manager.banks.keys()]
-    return await asyncio.gather(*tasks)
+    return await gather_with_concurrency(PLAID_REFRESH_CONCURRENCY, *tasks)
 
 @router.get("/{bank_code}/status", response_model=BankStatus)
 async def get_bank_status(bank_code: str):
@@ -632,54 +627,32 @@ async def get_plaid_usage():
                 test_bank = bank_code
                 break
         
-        if not test_bank:
-            return {
-                "used": 0,
-                "limit": 100,
-                "percentage": 0,
-                "remaining": 100,
-                "reset_date": (datetime.now().replace(day=1) + timedelta(days=32)).replace(day=1).strftime('%Y-%m-%d'),
-                "status": "no_active_banks"
-            }
-        
-        # Создаем коннектор для получения информации о лимитах
-        credentials = {
-            **bank_manager.plaid_credentials,
-            "access_token": bank_manager.banks[test_bank]['access_token'],
-            "item_id": bank_manager.banks[test_bank]['item_id'],
-            "bank_name": bank_manager.banks[test_bank]['name'],
-            "bank_code": test_bank
-        }
+        # Коннектор нужен только для чтения локального счетчика запросов
+        credentials = dict(bank_manager.plaid_credentials)
+        if test_bank:
+            credentials.update({
+                "access_token": bank_manager.banks[test_bank]['access_token'],
+                "item_id": bank_manager.banks[test_bank]['item_id'],
+                "bank_name": bank_manager.banks[test_bank]['name'],
+                "bank_code": test_bank
+            })
         
         connector = PlaidBankConnector(credentials)
         
-        # Получаем реальную информацию о лимитах из Plaid
+        # Счетчик ведется локально: читаем его, не тратя платный запрос к Plaid
         try:
-            # Делаем запрос к Plaid для получения информации о лимитах
-            from plaid.model.accounts_get_request import AccountsGetRequest
-            request = AccountsGetRequest(access_token=credentials["access_token"])
-            response = connector.client.accounts_get(request)
-            
-            # Получаем реальный счетчик из глобального кэша
-            from ..banks.plaid_integration import _global_monthly_cache
-            current_month = datetime.now().strftime('%Y-%m')
-            month_key = f"requests_{current_month}"
-            used_requests = _global_monthly_cache.get(month_key, 0)
-            
-            # Вычисляем дату сброса (первое число следующего месяца)
-            next_month = datetime.now().replace(day=1) + timedelta(days=32)
-            reset_date = next_month.replace(day=1).strftime('%Y-%m-%d')
+            rate_limit = await connector.get_rate_limit_status(probe=False)
             
             return {
-                "used": used_requests,
-                "limit": 100,
-                "percentage": round((used_requests / 100) * 100, 1),
-                "remaining": 100 - used_requests,
-                "reset_date": reset_date,
-                "status": "active"
+                "used": rate_limit['requests_used'],
+                "limit": rate_limit['monthly_limit'],
+                "percentage": round(rate_limit['usage_percentage'], 1),
+                "remaining": rate_limit['requests_remaining'],
+                "reset_date": rate_limit['reset_date'],
+                "status": "active" if test_bank else "no_active_banks"
             }
         except Exception as plaid_error:
-            logger.error(f"Ошибка получения лимитов Plaid: {plaid_error}")
+            logger.error("Ошибка получения лимитов Plaid: %s", plaid_error)
             # Fallback к статичным данным
             return {
                 "used": 0,
@@ -711,13 +684,10 @@ async def refresh_plaid_data(request: Request):
             logger.warning(">>> ОБНОВЛЕНИЕ НЕ ВЫПОЛНЕНО: не найдено банков для обновления.")
             return {"error": "Нет банков с токенами для обновления"}
         
-        # Обновляем данные для всех банков
-        updated_banks = []
-        total_accounts = 0
-        
-        for bank_code in banks_with_tokens:
+        # Обновляем данные для всех банков параллельно (с ограничением одновременных запросов)
+        async def refresh_bank(bank_code: str) -> Optional[Dict[str, Any]]:
             try:
-                logger.info(f"--> Начинаем обновление для банка: {bank_manager.banks[bank_code]['name']} ({bank_code})")
+                logger.info("--> Начинаем обновление для банка: %s (%s)", bank_manager.banks[bank_code]['name'], bank_code)
                 # Создаем коннектор для каждого банка
                 credentials = {
                     **bank_manager.plaid_credentials,
@@ -733,22 +703,28 @@ async def refresh_plaid_data(request: Request):
                 if await connector.connect():
                     # Принудительно увеличиваем счетчик запросов
                     await connector._increment_request_count()
-                    accounts = await connector.get_accounts()
-                    logger.info(f"<-- УСПЕШНО. Получено {len(accounts)} счетов для {bank_manager.banks[bank_code]['name']}.")
-                    updated_banks.append({
+                    accounts = await connector.get_accounts(force_refresh=True)
+                    logger.info("<-- УСПЕШНО. Получено %s счетов для %s.", len(accounts), bank_manager.banks[bank_code]['name'])
+                    return {
                         "bank_code": bank_code,
                         "bank_name": bank_manager.banks[bank_code]['name'],
                         "accounts_count": len(accounts)
-                    })
-                    total_accounts += len(accounts)
+                    }
+                return None
                     
             except Exception as bank_error:
-                logger.error(f"!!! ОШИБКА обновления для {bank_manager.banks[bank_code]['name']}: {bank_error}")
-                updated_banks.append({
+                logger.error("!!! ОШИБКА обновления для %s: %s", bank_manager.banks[bank_code]['name'], bank_error)
+                return {
                     "bank_code": bank_code,
                     "bank_name": bank_manager.banks[bank_code]['name'],
                     "error": str(bank_error)
-                })
+                }
+        
+        results = await gather_with_concurrency(
+            PLAID_REFRESH_CONCURRENCY, *(refresh_bank(bank_code) for bank_code in banks_with_tokens)
+        )
+        updated_banks = [result for result in results if result is not None]
+        total_accounts = sum(bank.get("accounts_count", 0) for bank in updated_banks)
         
         # Получаем актуальную информацию о лимитах
         if updated_banks:
@@ -763,7 +739,7 @@ async def refresh_plaid_data(request: Request):
             connector = PlaidBankConnector(credentials)
             rate_limit_status = await connector.get_rate_limit_status()
             
-            logger.info(f">>> ОБНОВЛЕНИЕ ЗАВЕРШЕНО. Обновлено банков: {len(updated_banks)}, счетов: {total_accounts}.")
+            logger.info(">>> ОБНОВЛЕНИЕ ЗАВЕРШЕНО. Обновлено банков: %s, счетов: %s.", len(updated_banks), total_accounts)
 
             return {
                 "success": True,
@@ -780,7 +756,7 @@ async def refresh_plaid_data(request: Request):
             return {"error": "Не удалось обновить данные ни для одного банка"}
             
     except Exception as e:
-        logger.critical(f"!!! КРИТИЧЕСКАЯ ОШИБКА в процессе обновления: {e}")
+        logger.critical("!!! КРИТИЧЕСКАЯ ОШИБКА в процессе обновления: %s", e)
         raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
 
 @router.get("/")
@@ -805,7 +781,7 @@ class TokenExchangeRequest(BaseModel):
 async def exchange_public_token(request: TokenExchangeRequest):
     """Обмен public_token на access_token через Plaid API"""
     try:
-        logger.info(f"Обмен токена для банка: {request.metadata.get('institution', {}).get('name', 'Unknown')}")
+        logger.info("Обмен токена для банка: %s", request.metadata.get('institution', {}).get('name', 'Unknown'))
         
         # Используем PlaidBankConnector для обмена токена
         plaid_connector = PlaidBankConnector({
@@ -832,7 +808,7 @@ async def exchange_public_token(request: TokenExchangeRequest):
                 item_id=item_id
             )
             
-            logger.info(f"Банк {institution_name} успешно добавлен с токеном")
+            logger.info("Банк %s успешно добавлен с токеном", institution_name)
             
             return {
                 "success": True,
@@ -846,5 +822,5 @@ async def exchange_public_token(request: TokenExchangeRequest):
             raise HTTPException(status_code=400, detail="Не удалось обменять токен")
             
     except Exception as e:
-        logger.error(f"Ошибка обмена токена: {e}")
+        logger.error("Ошибка обмена токена: %s", e)
         raise HTTPException(status_code=500, detail=f"Ошибка подключения банка: {str(e)}")
@@ -32,7 +32,7 @@ async def get_cache_stats():
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
-        logger.error(f"Ошибка получения статистики кэша: {e}")
+        logger.error("Ошибка получения статистики кэша: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/cache/cleanup")
@@ -47,7 +47,7 @@ async def cleanup_cache():
             "message": f"Удалено {deleted_count} истекших записей"
         }
     except Exception as e:
-        logger.error(f"Ошибка очистки кэша: {e}")
+        logger.error("Ошибка очистки кэша: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/cache/invalidate")
@@ -81,7 +81,7 @@ async def invalidate_cache(
             "message": f"Удалено {deleted_count} записей ({criteria_str})"
         }
     except Exception as e:
-        logger.error(f"Ошибка очистки кэша: {e}")
+        logger.error("Ошибка очистки кэша: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/cache/incremental/{bank_code}")
@@ -93,7 +93,8 @@ async def get_incremental_data(
     """Получение инкрементальных данных"""
     try:
         if last_update:
-            last_update_dt = datetime.fromisoformat(last_update.replace('Z', '+00:00'))
+            # Python 3.11+ разбирает суффикс 'Z' сам
+            last_update_dt = datetime.fromisoformat(last_update)
         else:
             last_update_dt = datetime.utcnow() - timedelta(days=1)
         
@@ -118,7 +119,7 @@ async def get_incremental_data(
                 "message": "Нет новых данных"
             }
     except Exception as e:
-        logger.error(f"Ошибка получения инкрементальных данных: {e}")
+        logger.error("Ошибка получения инкрементальных данных: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/cache/health")
@@ -138,7 +139,7 @@ async def cache_health_check():
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
-        logger.error(f"Ошибка проверки здоровья кэша: {e}")
+        logger.error("Ошибка проверки здоровья кэша: %s", e)
         return {
             "success": False,
             "healthy": False,
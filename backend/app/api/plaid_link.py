@@ -4,20 +4,20 @@ API для Plaid Link - получение новых токенов
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Tuple
+from datetime import datetime, timezone
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
+from ..banks.plaid_integration import call_plaid_api, get_plaid_api
 
 load_dotenv()
 
 router = APIRouter(prefix="/api/plaid", tags=["plaid-link"])
 
 def get_plaid_client():
-    """Получаем Plaid клиент"""
-    import plaid
-    from plaid.api import plaid_api
-    from plaid import Configuration, ApiClient, Environment
-    
+    """Получаем Plaid клиент (на общем пуле соединений коннектора)"""
     client_id = os.getenv("PLAID_CLIENT_ID")
     secret = os.getenv("PLAID_SECRET")
     environment = os.getenv("PLAID_ENVIRONMENT", "production")
@@ -25,15 +25,91 @@ def get_plaid_client():
     if not client_id or not secret:
         raise HTTPException(status_code=500, detail="Plaid credentials not configured")
     
-    configuration = Configuration(
-        host=Environment.Production if environment == 'production' else Environment.Sandbox,
-        api_key={
-            'clientId': client_id,
-            'secret': secret
-        }
+    return get_plaid_api(environment, client_id, secret)
+
+# Статический список банков - строится один раз при импорте модуля
+SUPPORTED_INSTITUTIONS = [
+    {
+        "id": "rbc",
+        "name": "Royal Bank of Canada",
+        "country": "CA",
+        "products": ["transactions"],
+        "logo": "https://cdn.plaid.com/institution_logos/rbc.png"
+    },
+    {
+        "id": "bmo",
+        "name": "Bank of Montreal",
+        "country": "CA", 
+        "products": ["transactions"],
+        "logo": "https://cdn.plaid.com/institution_logos/bmo.png"
+    },
+    {
+        "id": "cibc",
+        "name": "Canadian Imperial Bank of Commerce",
+        "country": "CA",
+        "products": ["transactions"],
+        "logo": "https://cdn.plaid.com/institution_logos/cibc.png"
+    },
+    {
+        "id": "walmart",
+        "name": "Walmart Rewards",
+        "country": "CA",
+        "products": ["transactions"],
+        "logo": "https://cdn.plaid.com/institution_logos/walmart.png"
+    }
+]
+
+# Кэш link_token: (токен, момент обновления по time.monotonic())
+_link_token_cache: Optional[Tuple[str, float]] = None
+LINK_TOKEN_EXPIRY_BUFFER = 300  # секунд до истечения, когда токен уже не выдаем
+# Текущий запрос link_token_create - параллельные вызовы ждут его, а не создают свой
+_link_token_inflight: Optional[asyncio.Task] = None
+
+async def _create_link_token() -> Tuple[str, float]:
+    """Создаем link_token в Plaid"""
+    from plaid.model.link_token_create_request import LinkTokenCreateRequest
+    from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
+    from plaid.model.country_code import CountryCode
+    from plaid.model.products import Products
+    
+    plaid_client = get_plaid_client()
+    
+    request = LinkTokenCreateRequest(
+        products=[Products('transactions')],
+        client_name="Budget Manager Cloud",
+        country_codes=[CountryCode('CA'), CountryCode('US')],
+        language='en',
+        user=LinkTokenCreateRequestUser(client_user_id='user-1')
     )
-    api_client = ApiClient(configuration)
-    return plaid_api.PlaidApi(api_client)
+    response = await call_plaid_api(plaid_client, 'link_token_create', request)
+    
+    expires_in = (response['expiration'] - datetime.now(timezone.utc)).total_seconds()
+    return response['link_token'], time.monotonic() + expires_in - LINK_TOKEN_EXPIRY_BUFFER
+
+async def _get_link_token() -> str:
+    """Возвращаем закэшированный link_token или создаем новый одним запросом на всех"""
+    global _link_token_inflight
+    
+    # link_token многоразовый до истечения - не создаем новый на каждую загрузку страницы
+    if _link_token_cache is not None and time.monotonic() < _link_token_cache[1]:
+        return _link_token_cache[0]
+    
+    task = _link_token_inflight
+    if task is None:
+        task = asyncio.create_task(_create_link_token())
+        _link_token_inflight = task
+        
+        def _on_done(t: asyncio.Task):
+            global _link_token_cache, _link_token_inflight
+            _link_token_inflight = None
+            if not t.cancelled() and t.exception() is None:
+                _link_token_cache = t.result()
+        
+        task.add_done_callback(_on_done)
+    
+    # shield: отмена одного из ожидающих не отменяет общий запрос
+    token, _ = await asyncio.shield(task)
+    return token
 
 class PlaidLinkConfig(BaseModel):
     client_id: str
@@ -58,24 +134,10 @@ async def get_plaid_link_config():
     """Получаем конфигурацию для Plaid Link"""
     try:
         # Создаем link_token для Plaid Link v2
-        from plaid.model.link_token_create_request import LinkTokenCreateRequest
-        from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
-        from plaid.model.country_code import CountryCode
-        from plaid.model.products import Products
-        
-        plaid_client = get_plaid_client()
-        
-        request = LinkTokenCreateRequest(
-            products=[Products('transactions')],
-            client_name="Budget Manager Cloud",
-            country_codes=[CountryCode('CA'), CountryCode('US')],
-            language='en',
-            user=LinkTokenCreateRequestUser(client_user_id='user-1')
-        )
-        response = plaid_client.link_token_create(request)
+        link_token = await _get_link_token()
         
         return {
-            "link_token": response['link_token'],
+            "link_token": link_token,
             "environment": os.getenv("PLAID_ENVIRONMENT", "production")
         }
     except Exception as e:
@@ -93,29 +155,16 @@ async def get_plaid_link_config():
 async def exchange_public_token(request: PlaidLinkTokenRequest):
     """Обмениваем public token на access token"""
     try:
-        import plaid
-        from plaid.api import plaid_api
         from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-        from plaid import Configuration, ApiClient
         
-        # Настройка Plaid клиента
-        configuration = Configuration(
-            host=plaid.Environment.Production if os.getenv("PLAID_ENVIRONMENT") == "production" else plaid.Environment.Sandbox,
-            api_key={
-                'clientId': os.getenv("PLAID_CLIENT_ID"),
-                'secret': os.getenv("PLAID_SECRET")
-            }
-        )
-        
-        api_client = ApiClient(configuration)
-        client = plaid_api.PlaidApi(api_client)
+        client = get_plaid_client()
         
         # Обмен public token на access token
         exchange_request = ItemPublicTokenExchangeRequest(
             public_token=request.public_token
         )
         
-        response = client.item_public_token_exchange(exchange_request)
+        response = await call_plaid_api(client, 'item_public_token_exchange', exchange_request)
         
         # Save bank to BankManager and database
         from ..api.bank_management import bank_manager
@@ -142,90 +191,49 @@ async def exchange_public_token(request: PlaidLinkTokenRequest):
 @router.get("/institutions")
 async def get_supported_institutions():
     """Получаем список поддерживаемых банков"""
-    return {
-        "institutions": [
-            {
-                "id": "rbc",
-                "name": "Royal Bank of Canada",
-                "country": "CA",
-                "products": ["transactions"],
-                "logo": "https://cdn.plaid.com/institution_logos/rbc.png"
-            },
-            {
-                "id": "bmo",
-                "name": "Bank of Montreal",
-                "country": "CA", 
-                "products": ["transactions"],
-                "logo": "https://cdn.plaid.com/institution_logos/bmo.png"
-            },
-            {
-                "id": "cibc",
-                "name": "Canadian Imperial Bank of Commerce",
-                "country": "CA",
-                "products": ["transactions"],
-                "logo": "https://cdn.plaid.com/institution_logos/cibc.png"
-            },
-            {
-                "id": "walmart",
-                "name": "Walmart Rewards",
-                "country": "CA",
-                "products": ["transactions"],
-                "logo": "https://cdn.plaid.com/institution_logos/walmart.png"
-            }
-        ]
-    }
+    return {"institutions": SUPPORTED_INSTITUTIONS}
+
+def _update_env_tokens(bank_code: str, access_token: str, item_id: str):
+    """Запись новых токенов банка в .env (блокирующий файловый ввод-вывод)"""
+    # Читаем текущий .env
+    env_path = os.path.join(os.getcwd(), '.env')
+    env_content = ""
+    if os.path.exists(env_path):
+        with open(env_path, 'r', encoding='utf-8') as f:
+            env_content = f.read()
+    
+    # Обновляем токены
+    new_env_content = []
+    for line in env_content.splitlines():
+        if f"{bank_code}_ACCESS_TOKEN=" in line:
+            new_env_content.append(f"{bank_code}_ACCESS_TOKEN={access_token}")
+        elif f"{bank_code}_ITEM_ID=" in line:
+            new_env_content.append(f"{bank_code}_ITEM_ID={item_id}")
+        else:
+            new_env_content.append(line)
+    
+    with open(env_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(new_env_content))
 
 @router.post("/link/update")
 async def update_existing_item(request: PlaidLinkTokenRequest):
     """Обновляем существующий item через Plaid Link в update mode"""
     try:
-        import plaid
-        from plaid.api import plaid_api
         from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-        from plaid import Configuration, ApiClient
-        
-        # Настройка Plaid клиента
-        configuration = Configuration(
-            host=plaid.Environment.Production if os.getenv("PLAID_ENVIRONMENT") == "production" else plaid.Environment.Sandbox,
-            api_key={
-                'clientId': os.getenv("PLAID_CLIENT_ID"),
-                'secret': os.getenv("PLAID_SECRET")
-            }
-        )
-        api_client = ApiClient(configuration)
-        plaid_client = plaid_api.PlaidApi(api_client)
         
         # Обмениваем public token на access token
         exchange_request = ItemPublicTokenExchangeRequest(
             public_token=request.public_token
         )
         plaid_client = get_plaid_client()
-        exchange_response = plaid_client.item_public_token_exchange(exchange_request)
+        exchange_response = await call_plaid_api(plaid_client, 'item_public_token_exchange', exchange_request)
         access_token = exchange_response['access_token']
         item_id = exchange_response['item_id']
         
         # Обновляем .env файл
         bank_code = request.institution_id.upper()
         
-        # Читаем текущий .env
-        env_path = os.path.join(os.getcwd(), '.env')
-        env_content = ""
-        if os.path.exists(env_path):
-            with open(env_path, 'r', encoding='utf-8') as f:
-                env_content = f.read()
-        
-        # Обновляем токены
-        new_env_content = []
-        for line in env_content.splitlines():
-            if f"{bank_code}_ACCESS_TOKEN=" in line:
-                new_env_content.append(f"{bank_code}_ACCESS_TOKEN={access_token}")
-            elif f"{bank_code}_ITEM_ID=" in line:
-                new_env_content.append(f"{bank_code}_ITEM_ID={item_id}")
-            else:
-                new_env_content.append(line)
-        
-        with open(env_path, 'w', encoding='utf-8') as f:
-            f.write("\n".join(new_env_content))
+        await asyncio.to_thread(_update_env_tokens, bank_code, access_token, item_id)
         
         return {"access_token": access_token, "item_id": item_id, "message": "Item updated successfully."}
     except Exception as e:
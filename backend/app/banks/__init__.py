@@ -1,7 +1,7 @@
 # Банковские интеграции
-from .base import BankConnector
+from .base import BankConnector, gather_with_concurrency, require_connected
 from .plaid_integration import PlaidBankConnector
 
-__all__ = ['BankConnector', 'PlaidBankConnector']
+__all__ = ['BankConnector', 'PlaidBankConnector', 'gather_with_concurrency', 'require_connected']
 
 
@@ -4,8 +4,10 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from datetime import datetime, date
+import asyncio
+import functools
+from typing import Awaitable, List, Dict, Any, Optional
+from datetime import date
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,6 +22,12 @@ class BankConnector(ABC):
     - get_accounts() - получение списка счетов
     - get_transactions() - получение транзакций
     - get_balance() - получение баланса
+    
+    Коннектор можно использовать как асинхронный контекстный менеджер,
+    тогда отключение гарантировано даже при ошибке:
+    
+        async with PlaidBankConnector(credentials) as connector:
+            accounts = await connector.get_accounts()
     """
     
     def __init__(self, bank_name: str, credentials: Dict[str, Any]):
@@ -93,10 +101,17 @@ class BankConnector(ABC):
             try:
                 await self.connection.close()
             except Exception as e:
-                logger.error(f"Ошибка при отключении от {self.bank_name}: {e}")
+                logger.error("Ошибка при отключении от %s: %s", self.bank_name, e)
             finally:
                 self.connection = None
-                self.is_connected = False
+        self.is_connected = False
+    
+    async def __aenter__(self) -> "BankConnector":
+        await self.connect()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.disconnect()
     
     def __str__(self) -> str:
         return f"{self.bank_name}Connector(connected={self.is_connected})"
@@ -125,3 +140,36 @@ class DataError(BankError):
     pass
 
 
+def require_connected(method):
+    """
+    Декоратор для методов коннектора, требующих активного подключения
+    
+    Raises:
+        ConnectionError: если connect() не был вызван
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        if not self.is_connected:
+            raise ConnectionError(f"Нет подключения к {self.bank_name}")
+        return await method(self, *args, **kwargs)
+    return wrapper
+
+
+async def gather_with_concurrency(limit: int, *coros: Awaitable[Any]) -> List[Any]:
+    """
+    asyncio.gather с ограничением числа одновременно выполняемых корутин
+    
+    Args:
+        limit: Максимум одновременных корутин (учитывайте лимиты банка)
+        coros: Корутины для выполнения
+        
+    Returns:
+        Результаты в порядке переданных корутин
+    """
+    semaphore = asyncio.Semaphore(limit)
+    
+    async def run(coro: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await coro
+    
+    return await asyncio.gather(*(run(coro) for coro in coros))
@@ -8,23 +8,234 @@ from plaid.api import plaid_api
 from plaid.model.accounts_get_request import AccountsGetRequest
 from plaid.model.transactions_get_request import TransactionsGetRequest
 from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
+from plaid.model.transactions_sync_request import TransactionsSyncRequest
 from plaid.model.institutions_get_by_id_request import InstitutionsGetByIdRequest
 from plaid.model.country_code import CountryCode
 from plaid import Configuration, ApiClient
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 import asyncio
+import functools
+from collections import Counter
 import logging
+import random
+import time
+import urllib3
+from operator import itemgetter
 from datetime import datetime, timedelta
-import json
-import os
-from .base import BankConnector, BankError, ConnectionError, AuthenticationError, DataError
+from .base import BankConnector, BankError, ConnectionError, AuthenticationError, DataError, gather_with_concurrency, require_connected
 from ..services.cache_service import PlaidCacheService
 
 logger = logging.getLogger(__name__)
 
-# Глобальный счетчик запросов
+# Глобальный счетчик запросов ("requests_YYYY-MM" -> число запросов).
+# Изменяется только под _counter_lock
 _global_request_count = 0
-_global_monthly_cache = {}
+_global_monthly_cache: Counter = Counter()
+_counter_lock = asyncio.Lock()
+_MONTHLY_HISTORY = 12  # месяцев в счетчике
+# Счетчик уже дополнен сохраненными значениями (один раз на процесс)
+_request_count_restored = False
+
+# Кэш в памяти процесса, общий для всех экземпляров коннектора:
+# "<пространство имен>:<ключ>" -> (данные, время сохранения по time.monotonic())
+_shared_cache: Dict[str, Tuple[Any, float]] = {}
+
+# Попадания и промахи общего кэша (для optimize_requests)
+_cache_hits = 0
+_cache_misses = 0
+
+# Блокировки single-flight для accounts_get: access_token -> asyncio.Lock
+_accounts_locks: Dict[str, asyncio.Lock] = {}
+
+# Выполняющиеся запросы accounts_get для get_accounts: access_token -> asyncio.Task
+_accounts_inflight: Dict[str, asyncio.Task] = {}
+
+# Последний ответ get_accounts: access_token -> (счета, время по time.monotonic()).
+# Короткий TTL: повторные обновления интерфейса не расходуют запросы к Plaid
+_accounts_cache: Dict[str, Tuple[List[Dict[str, Any]], float]] = {}
+_ACCOUNTS_CACHE_TTL = 30  # секунд
+
+# Stale-while-revalidate: сколько секунд после истечения TTL запись еще
+# можно отдать, пока она обновляется в фоне
+_SWR_WINDOW = 600
+_accounts_refreshing: set = set()
+_background_tasks: set = set()
+
+# Повторы временных ошибок Plaid (429/5xx, сетевые сбои)
+_PLAID_MAX_ATTEMPTS = 4
+_PLAID_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_PLAID_BACKOFF_BASE = 0.25  # секунды
+_PLAID_BACKOFF_MAX = 2.0
+_PLAID_RETRY_AFTER_MAX = 10.0  # секунд: дольше Retry-After не ждем внутри запроса
+
+# Автомат отключения (circuit breaker): после стольких подряд вызовов,
+# не прошедших из-за временных ошибок, запросы к Plaid сразу отклоняются
+# на время паузы, а вызывающий код переходит на кэш
+_PLAID_BREAKER_THRESHOLD = 5
+_PLAID_BREAKER_COOLDOWN = 30.0  # секунд
+_plaid_breaker_failures = 0
+_plaid_breaker_open_until = 0.0  # по time.monotonic()
+
+# Таймауты запроса к Plaid: (подключение, чтение) в секундах.
+# Без них urllib3 ждет ответа зависшего сервера бесконечно
+_PLAID_REQUEST_TIMEOUT = (3, 20)
+
+# Кэш проверки доступности Plaid: (момент истечения по time.monotonic(), результат)
+_plaid_probe: Optional[Tuple[float, bool]] = None
+_PLAID_PROBE_TTL = 15  # секунд
+_PLAID_PROBE_NEGATIVE_TTL = 5  # секунд, чтобы быстрее заметить восстановление Plaid
+_PLAID_PROBE_REQUEST = InstitutionsGetByIdRequest(
+    institution_id="ins_37",  # CIBC institution ID
+    country_codes=[CountryCode("CA")]
+)
+
+# Типы и подтипы счетов Plaid, баланс которых показывается как кредитный лимит
+_CREDIT_TYPES = frozenset({'credit'})
+_CREDIT_SUBTYPES = frozenset({'credit card', 'line of credit'})
+
+# Размер страницы transactions_get (максимум Plaid - 500)
+_PLAID_TRANSACTIONS_PAGE_SIZE = 500
+
+# Максимум одновременных запросов к Plaid при загрузке по нескольким счетам
+_PLAID_BULK_CONCURRENCY = 8
+
+# Статистика вызовов Plaid по методам API (для optimize_requests):
+# метод -> {'calls', 'errors', 'total_seconds', 'max_seconds'}
+_plaid_call_stats: Dict[str, Dict[str, float]] = {}
+
+
+def _record_plaid_call(endpoint: str, seconds: float, failed: bool = False):
+    """Учет одного вызова Plaid API (каждая попытка считается отдельно)"""
+    stats = _plaid_call_stats.setdefault(
+        endpoint, {'calls': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+    )
+    stats['calls'] += 1
+    stats['total_seconds'] += seconds
+    stats['max_seconds'] = max(stats['max_seconds'], seconds)
+    if failed:
+        stats['errors'] += 1
+
+
+def _record_breaker_failure():
+    """Учет вызова Plaid, не прошедшего из-за временных ошибок"""
+    global _plaid_breaker_failures, _plaid_breaker_open_until
+    
+    _plaid_breaker_failures += 1
+    if _plaid_breaker_failures >= _PLAID_BREAKER_THRESHOLD:
+        _plaid_breaker_open_until = time.monotonic() + _PLAID_BREAKER_COOLDOWN
+        logger.error("Plaid недоступен %d вызовов подряд, запросы приостановлены на %.0f с",
+                     _plaid_breaker_failures, _PLAID_BREAKER_COOLDOWN)
+
+
+# Текущий месяц 'YYYY-MM', пересчитывается не чаще раза в _MONTH_CACHE_TTL секунд
+_month_cache = {"ts": 0.0, "value": ""}
+_MONTH_CACHE_TTL = 60
+
+
+def _current_month() -> str:
+    """Текущий месяц в формате 'YYYY-MM' без форматирования даты на каждый запрос"""
+    now = time.monotonic()
+    if not _month_cache["value"] or now - _month_cache["ts"] > _MONTH_CACHE_TTL:
+        _month_cache["value"] = datetime.now().strftime('%Y-%m')
+        _month_cache["ts"] = now
+    return _month_cache["value"]
+
+
+# Дата сброса лимита для месяца: (месяц 'YYYY-MM', дата 'YYYY-MM-DD')
+_reset_date_cache: Tuple[str, str] = ("", "")
+
+
+def _reset_date(current_month: str) -> str:
+    """Дата сброса месячного лимита (первое число следующего месяца)"""
+    global _reset_date_cache
+    
+    if _reset_date_cache[0] != current_month:
+        year, month = map(int, current_month.split('-'))
+        next_month = datetime(year + month // 12, month % 12 + 1, 1)
+        _reset_date_cache = (current_month, next_month.strftime('%Y-%m-%d'))
+    return _reset_date_cache[1]
+
+
+# Выборка полей из ответов Plaid одним вызовом
+_transaction_fields = itemgetter('transaction_id', 'account_id', 'amount', 'name', 'date')
+_account_fields = itemgetter('account_id', 'name', 'type', 'subtype', 'balances')
+
+
+def _format_transaction(transaction: Any) -> Dict[str, Any]:
+    """Строка транзакции из ответа Plaid (transactions/get и transactions/sync)"""
+    transaction_id, account_id, amount, name, date = _transaction_fields(transaction)
+    return {
+        'id': transaction_id, 'amount': amount, 'name': name, 'date': date,
+        'category': transaction.get('category') or ['Uncategorized'],
+        'account_id': account_id,
+        'currency': transaction.get('iso_currency_code', 'USD')
+    }
+
+# Адреса Plaid API по окружению (все, кроме production, идут в sandbox)
+_PLAID_HOSTS = {
+    'production': plaid.Environment.Production,
+    'sandbox': plaid.Environment.Sandbox
+}
+
+# Размер пула HTTPS-соединений общего ApiClient
+_PLAID_POOL_MAXSIZE = 32
+
+# Созданные общие ApiClient (для закрытия при остановке приложения)
+_api_clients: List[ApiClient] = []
+
+
+@functools.lru_cache(maxsize=4)
+def _get_api_client(environment: str, client_id: Optional[str], secret: Optional[str]) -> ApiClient:
+    """
+    Общий ApiClient для окружения и учетных данных
+    
+    Один пул urllib3 на процесс: TLS-соединения с Plaid переиспользуются
+    между запросами и экземплярами коннектора.
+    """
+    configuration = Configuration(
+        host=_PLAID_HOSTS.get(environment, plaid.Environment.Sandbox),
+        api_key={
+            'clientId': client_id,
+            'secret': secret
+        }
+    )
+    configuration.connection_pool_maxsize = _PLAID_POOL_MAXSIZE
+    api_client = ApiClient(configuration)
+    # Ответы transactions/get крупные: просим gzip, urllib3 распаковывает сам
+    api_client.set_default_header('Accept-Encoding', 'gzip')
+    _api_clients.append(api_client)
+    return api_client
+
+
+def get_plaid_api(environment: str, client_id: Optional[str], secret: Optional[str]) -> plaid_api.PlaidApi:
+    """
+    PlaidApi на общем ApiClient - для кода вне коннектора (Plaid Link)
+    """
+    return plaid_api.PlaidApi(_get_api_client(environment, client_id, secret))
+
+
+async def call_plaid_api(client: plaid_api.PlaidApi, method_name: str, request: Any) -> Any:
+    """
+    Вызов метода PlaidApi вне коннектора: в пуле потоков и с таймаутами
+    _PLAID_REQUEST_TIMEOUT, чтобы зависший Plaid не держал запрос бесконечно
+    """
+    return await asyncio.to_thread(
+        getattr(client, method_name), request, _request_timeout=_PLAID_REQUEST_TIMEOUT
+    )
+
+
+def close_api_clients():
+    """
+    Закрытие общих ApiClient и их пулов соединений (при остановке приложения)
+    """
+    while _api_clients:
+        api_client = _api_clients.pop()
+        try:
+            api_client.rest_client.pool_manager.clear()
+            api_client.close()
+        except Exception as e:
+            logger.warning("Ошибка закрытия Plaid ApiClient: %s", e)
+    _get_api_client.cache_clear()
 
 
 class PlaidBankConnector(BankConnector):
@@ -35,35 +246,36 @@ class PlaidBankConnector(BankConnector):
     def __init__(self, credentials: Dict[str, Any]):
         super().__init__("Plaid", credentials)
         
+        # Данные подключения банка
+        self.access_token = credentials.get('access_token')
+        self.bank_code = credentials.get('bank_code', 'UNKNOWN')
+        self.item_id = credentials.get('item_id')
+        # self.bank_name занят именем коннектора ("Plaid")
+        self.institution_name = credentials.get('bank_name')
+        
+        # Запрос accounts_get зависит только от access_token - строим его один раз
+        self._accounts_request = AccountsGetRequest(access_token=self.access_token) if self.access_token else None
+        
         # Настройка Plaid клиента
         self.client_id = credentials.get('client_id')
         self.secret = credentials.get('secret')
         self.environment = credentials.get('environment', 'sandbox')
         
-        # Инициализация Plaid API
-        configuration = Configuration(
-            host=plaid.Environment.Production if self.environment == 'production' else plaid.Environment.Sandbox,
-            api_key={
-                'clientId': self.client_id,
-                'secret': self.secret
-            }
-        )
-        
-        api_client = ApiClient(configuration)
+        # Инициализация Plaid API (ApiClient и пул соединений общие для процесса)
+        api_client = _get_api_client(self.environment, self.client_id, self.secret)
         self.client = plaid_api.PlaidApi(api_client)
         
         # Персистентный кэш
         self.cache_service = PlaidCacheService()
         
-        # Старый кэш для совместимости (будет удален)
-        self.cache = {}
+        # Кэш в памяти, общий для всех коннекторов процесса.
+        # Ключи разделены по item_id, чтобы банки не видели данные друг друга
+        self.cache = _shared_cache
+        self._cache_namespace = self.item_id or self.bank_code
         self.cache_ttl = 300  # 5 минут
         self.request_count = 0
         self.monthly_limit = 100  # Бесплатный лимит
         
-        # Восстанавливаем счетчик из кэша при инициализации
-        asyncio.create_task(self._restore_request_count())
-        
     async def connect(self) -> bool:
         """
         Подключение к Plaid (не требует отдельного подключения)
@@ -73,21 +285,20 @@ class PlaidBankConnector(BankConnector):
             self.is_connected = True
             return True
         except Exception as e:
-            logger.error(f"Ошибка инициализации Plaid: {e}")
+            logger.error("Ошибка инициализации Plaid: %s", e)
             raise ConnectionError(f"Не удалось инициализировать Plaid: {e}")
     
     async def _check_rate_limit(self) -> bool:
         """
         Проверка лимитов запросов
         """
-        current_month = datetime.now().strftime('%Y-%m')
-        month_key = f"requests_{current_month}"
+        await self._restore_request_count()
         
-        if month_key not in self.cache:
-            self.cache[month_key] = 0
+        current_month = _current_month()
+        month_key = f"requests_{current_month}"
         
-        if self.cache[month_key] >= self.monthly_limit:
-            logger.warning(f"Достигнут месячный лимит запросов: {self.monthly_limit}")
+        if _global_monthly_cache.get(month_key, 0) >= self.monthly_limit:
+            logger.warning("Достигнут месячный лимит запросов: %s", self.monthly_limit)
             return False
         
         return True
@@ -96,344 +307,770 @@ class PlaidBankConnector(BankConnector):
         """
         Увеличение счетчика запросов с сохранением в БД
         """
-        global _global_request_count, _global_monthly_cache
+        global _global_request_count
         
-        current_month = datetime.now().strftime('%Y-%m')
-        month_key = f"requests_{current_month}"
-        
-        if month_key not in _global_monthly_cache:
-            _global_monthly_cache[month_key] = 0
+        await self._restore_request_count()
         
-        _global_monthly_cache[month_key] += 1
-        _global_request_count += 1
-        self.request_count = _global_request_count
+        current_month = _current_month()
+        month_key = f"requests_{current_month}"
         
-        # Сохраняем в кэш для персистентности
-        try:
+        async with _counter_lock:
+            _global_monthly_cache[month_key] += 1
+            _global_request_count += 1
+            
+            # Храним только последние месяцы (ключи 'requests_YYYY-MM' сортируются по времени)
+            if len(_global_monthly_cache) > _MONTHLY_HISTORY:
+                for old_key in sorted(_global_monthly_cache)[:-_MONTHLY_HISTORY]:
+                    del _global_monthly_cache[old_key]
+            self.request_count = _global_request_count
+            
             cache_data = {
-                'monthly_requests': _global_monthly_cache,
+                'monthly_requests': dict(_global_monthly_cache),
                 'total_requests': _global_request_count,
                 'last_updated': datetime.now().isoformat()
             }
+        
+        # Сохраняем в кэш для персистентности
+        try:
             await self.cache_service.cache_data("plaid_request_count", cache_data)
         except Exception as e:
-            logger.warning(f"Не удалось сохранить счетчик запросов: {e}")
+            logger.warning("Не удалось сохранить счетчик запросов: %s", e)
         
-        logger.info(f"Запросов в этом месяце: {_global_monthly_cache[month_key]}/{self.monthly_limit}")
+        logger.info("Запросов в этом месяце: %s/%s", _global_monthly_cache[month_key], self.monthly_limit)
     
     async def _restore_request_count(self):
         """
-        Восстанавливаем счетчик запросов из кэша при запуске
+        Восстанавливаем счетчик запросов из кэша (один раз на процесс)
+        
+        Вызывается перед первым чтением или изменением счетчика. Сохраненные
+        значения прибавляются к счетчику в памяти, а не заменяют его.
         """
-        global _global_request_count, _global_monthly_cache
+        global _global_request_count, _request_count_restored
         
-        try:
-            cached_data = await self.cache_service.get_cached_data("plaid_request_count")
-            if cached_data:
-                _global_monthly_cache = cached_data.get('monthly_requests', {})
-                _global_request_count = cached_data.get('total_requests', 0)
-                self.request_count = _global_request_count
-                
-                current_month = datetime.now().strftime('%Y-%m')
-                month_key = f"requests_{current_month}"
-                current_requests = _global_monthly_cache.get(month_key, 0)
-                
-                logger.info(f"Восстановлен счетчик запросов: {current_requests} в этом месяце, {_global_request_count} всего")
-        except Exception as e:
-            logger.warning(f"Не удалось восстановить счетчик запросов: {e}")
+        if _request_count_restored:
+            return
+        
+        async with _counter_lock:
+            if _request_count_restored:
+                return
+            _request_count_restored = True
+            
+            try:
+                cached_data = await self.cache_service.get_cached_data("plaid_request_count")
+            except Exception as e:
+                logger.warning("Не удалось восстановить счетчик запросов: %s", e)
+                return
+            
+            # cache_data хранит снимок счетчика в поле 'data' записи кэша
+            snapshot = cached_data.get('data') if cached_data else None
+            if not snapshot:
+                return
+            
+            _global_monthly_cache.update(snapshot.get('monthly_requests', {}))
+            _global_request_count += snapshot.get('total_requests', 0)
+            self.request_count = _global_request_count
+        
+        current_requests = _global_monthly_cache.get(f"requests_{_current_month()}", 0)
+        logger.info("Восстановлен счетчик запросов: %s в этом месяце, %s всего", current_requests, _global_request_count)
+    
+    async def _call_plaid(self, method_name: str, request: Any, count_request: bool = True,
+                          retry: bool = True) -> Any:
+        """
+        Единая точка вызова Plaid API
+        
+        Временные ошибки (429/5xx и сетевые сбои) повторяются с экспоненциальной
+        задержкой со случайным разбросом (или по Retry-After), чтобы не
+        перезапускать весь сценарий. Если Plaid раз за разом недоступен,
+        автомат отключения на время перестает отправлять запросы.
+
+        Args:
+            method_name: Имя метода PlaidApi (например, 'accounts_get')
+            request: Объект запроса Plaid
+            count_request: Учитывать ли запрос в месячном счетчике
+            retry: Повторять ли запрос при временных ошибках
+
+        Returns:
+            Ответ Plaid API
+        """
+        global _plaid_breaker_failures
+        
+        if time.monotonic() < _plaid_breaker_open_until:
+            raise DataError(f"Plaid {method_name} пропущен: Plaid временно недоступен")
+        
+        max_attempts = _PLAID_MAX_ATTEMPTS if retry else 1
+        
+        for attempt in range(1, max_attempts + 1):
+            started = time.perf_counter()
+            retry_after = None
+            try:
+                # SDK синхронный (urllib3): выполняем в пуле потоков, чтобы не блокировать event loop
+                response = await call_plaid_api(self.client, method_name, request)
+                _record_plaid_call(method_name, time.perf_counter() - started)
+                break
+            except plaid.ApiException as e:
+                _record_plaid_call(method_name, time.perf_counter() - started, failed=True)
+                if e.status not in _PLAID_RETRY_STATUSES:
+                    raise DataError(f"Plaid {method_name} вернул ошибку {e.status}: {e.reason}")
+                if attempt == max_attempts:
+                    _record_breaker_failure()
+                    raise DataError(f"Plaid {method_name} вернул ошибку {e.status}: {e.reason}")
+                if e.headers:
+                    retry_after = e.headers.get('Retry-After')
+                error = e
+            except urllib3.exceptions.HTTPError as e:
+                _record_plaid_call(method_name, time.perf_counter() - started, failed=True)
+                if attempt == max_attempts:
+                    _record_breaker_failure()
+                    raise DataError(f"Plaid {method_name} недоступен: {e}")
+                error = e
+            
+            if retry_after is not None and retry_after.isdigit():
+                delay = min(float(retry_after), _PLAID_RETRY_AFTER_MAX)
+            else:
+                delay = random.uniform(0, min(_PLAID_BACKOFF_MAX, _PLAID_BACKOFF_BASE * 2 ** attempt))
+            logger.warning("Временная ошибка Plaid %s (%s), попытка %d/%d, повтор через %.2f с",
+                           method_name, error, attempt, max_attempts, delay)
+            await asyncio.sleep(delay)
+        
+        _plaid_breaker_failures = 0
+        
+        if count_request:
+            await self._increment_request_count()
+        
+        return response
     
     async def _get_cached_data(self, key: str) -> Optional[Any]:
         """
         Получение данных из кэша
         """
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if datetime.now() - timestamp < timedelta(seconds=self.cache_ttl):
-                logger.debug(f"Данные получены из кэша: {key}")
-                return data
-            else:
-                del self.cache[key]
+        global _cache_hits, _cache_misses
+        
+        entry = self._get_cached_entry(key)
+        if entry is not None and not entry[1]:
+            _cache_hits += 1
+            logger.debug("Данные получены из кэша: %s", key)
+            return entry[0]
+        _cache_misses += 1
+        return None
+    
+    def _get_cached_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """
+        Запись кэша с признаком устаревания: (данные, устарели ли)
+        
+        Устаревшие записи хранятся еще _SWR_WINDOW секунд после cache_ttl,
+        чтобы их можно было отдать, пока идет фоновое обновление.
+        """
+        cache_key = f"{self._cache_namespace}:{key}"
+        entry = self.cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        data, timestamp = entry
+        age = time.monotonic() - timestamp
+        if age < self.cache_ttl:
+            return data, False
+        if age < self.cache_ttl + _SWR_WINDOW:
+            return data, True
+        
+        self.cache.pop(cache_key, None)
         return None
     
     async def _cache_data(self, key: str, data: Any):
         """
         Сохранение данных в кэш
         """
-        self.cache[key] = (data, datetime.now())
-        logger.debug(f"Данные сохранены в кэш: {key}")
+        self.cache[f"{self._cache_namespace}:{key}"] = (data, time.monotonic())
+        logger.debug("Данные сохранены в кэш: %s", key)
     
-    async def get_accounts(self) -> List[Dict[str, Any]]:
+    @require_connected
+    async def get_accounts(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """
-        Получение счетов БЕЗ кэширования - всегда актуальные данные из Plaid
+        Получение счетов из Plaid
+        
+        Ответ держится в памяти _ACCOUNTS_CACHE_TTL секунд, чтобы частые
+        обновления интерфейса не тратили месячный лимит. force_refresh=True
+        всегда запрашивает актуальные данные.
         """
+        # Получаем access_token из credentials
+        access_token = self.access_token
+        if not access_token:
+            raise AuthenticationError("Access token не найден")
+        
+        if not force_refresh:
+            cached = _accounts_cache.get(access_token)
+            if cached is not None and time.monotonic() - cached[1] < _ACCOUNTS_CACHE_TTL:
+                logger.debug("Счета получены из кэша (%d)", len(cached[0]))
+                return cached[0]
+        
+        # Проверяем лимиты
+        if not await self._check_rate_limit():
+            logger.warning("Превышен лимит запросов к Plaid API")
+            raise DataError("Превышен лимит запросов к Plaid API")
+        
+        # Запрос к Plaid API. Одновременные вызовы для одного access_token
+        # ждут один общий запрос, а не отправляют свои
+        task = _accounts_inflight.get(access_token)
+        if task is None:
+            task = asyncio.create_task(self._call_plaid('accounts_get', self._accounts_request))
+            _accounts_inflight[access_token] = task
+            task.add_done_callback(lambda _: _accounts_inflight.pop(access_token, None))
+        
         try:
-            bank_code = self.credentials.get('bank_code', 'UNKNOWN')
-            
-            # Проверяем лимиты
-            if not await self._check_rate_limit():
-                logger.warning("Превышен лимит запросов к Plaid API")
-                raise DataError("Превышен лимит запросов к Plaid API")
-            
-            # Получаем access_token из credentials
-            access_token = self.credentials.get('access_token')
-            if not access_token:
-                raise AuthenticationError("Access token не найден")
-            
-            # Запрос к Plaid API
-            request = AccountsGetRequest(access_token=access_token)
-            response = self.client.accounts_get(request)
-            
-            await self._increment_request_count()
-            
-            # Обработка ответа
-            accounts = []
-            for account in response['accounts']:
-                # Правильное отображение балансов для разных типов счетов
-                account_type = str(account['type'])
-                subtype = str(account['subtype'])
-                balances = account['balances']
-                
-                # Для кредитных карт показываем лимит и остаток по лимиту
-                if account_type == 'credit' or (isinstance(subtype, str) and 'credit' in subtype.lower()):
-                    # Для кредитных карт: available = доступный лимит, current = потраченная сумма
-                    credit_limit = balances.get('limit')  # Общий лимит от Plaid
-                    current_balance = balances.get('current', 0)  # Потраченная сумма
-                    available_credit = balances.get('available', 0)  # Доступный лимит
-                    
-                    # Если limit не предоставлен Plaid, вычисляем как available + current
-                    if credit_limit is None:
-                        credit_limit = available_credit + current_balance
-                    
-                    accounts.append({
-                        'id': account['account_id'],
-                        'name': account['name'],
-                        'type': account['type'],
-                        'subtype': account['subtype'],
-                        'current_balance': available_credit,  # Доступный лимит
-                        'credit_limit': credit_limit,  # Общий лимит
-                        'used_credit': current_balance,  # Использованный лимит
-                        'currency': account['balances']['iso_currency_code'],
-                        'bank_name': self.credentials.get('bank_name', account.get('institution_name', 'Unknown')),
-                        'balance_type': 'credit_available'  # Тип баланса для фронтенда
-                    })
-                else:
-                    # Для депозитных счетов показываем текущий баланс
-                    accounts.append({
-                        'id': account['account_id'],
-                        'name': account['name'],
-                        'type': account['type'],
-                        'subtype': account['subtype'],
-                        'current_balance': balances.get('current', 0),
-                        'available_balance': balances.get('available', balances.get('current', 0)),
-                        'currency': account['balances']['iso_currency_code'],
-                        'bank_name': self.credentials.get('bank_name', account.get('institution_name', 'Unknown')),
-                        'balance_type': 'deposit'  # Тип баланса для фронтенда
-                    })
-            
-            # НЕ сохраняем в кэш - всегда актуальные данные!
-            logger.info(f"Получено {len(accounts)} счетов через Plaid (актуальные данные)")
-            return accounts
-            
-        except Exception as e:
-            logger.error(f"Ошибка получения счетов Plaid: {e}")
+            # shield: отмена одного из ожидающих не отменяет общий запрос
+            response = await asyncio.shield(task)
+        except BankError as e:
+            logger.error("Ошибка получения счетов Plaid: %s", e)
             # НЕ возвращаем кэшированные данные - показываем ошибку
             raise DataError(f"Не удалось получить актуальные данные счетов: {e}")
+        
+        # Обработка ответа
+        accounts = [self._format_account(account) for account in response['accounts']]
+        
+        _accounts_cache[access_token] = (accounts, time.monotonic())
+        logger.info("Получено %d счетов через Plaid (актуальные данные)", len(accounts))
+        return accounts
     
+    def _format_account(self, account: Any) -> Dict[str, Any]:
+        """
+        Правильное отображение балансов для разных типов счетов
+        """
+        account_id, name, account_type, subtype, balances = _account_fields(account)
+        bank_name = self.institution_name or account.get('institution_name', 'Unknown')
+        
+        # Для кредитных карт показываем лимит и остаток по лимиту
+        if str(account_type) in _CREDIT_TYPES or str(subtype).lower() in _CREDIT_SUBTYPES:
+            # Для кредитных карт: available = доступный лимит, current = потраченная сумма
+            credit_limit = balances.get('limit')  # Общий лимит от Plaid
+            current_balance = balances.get('current', 0)  # Потраченная сумма
+            available_credit = balances.get('available', 0)  # Доступный лимит
+            
+            # Если limit не предоставлен Plaid, вычисляем как available + current
+            if credit_limit is None:
+                credit_limit = available_credit + current_balance
+            
+            return {
+                'id': account_id,
+                'name': name,
+                'type': account_type,
+                'subtype': subtype,
+                'current_balance': available_credit,  # Доступный лимит
+                'credit_limit': credit_limit,  # Общий лимит
+                'used_credit': current_balance,  # Использованный лимит
+                'currency': balances['iso_currency_code'],
+                'bank_name': bank_name,
+                'balance_type': 'credit_available'  # Тип баланса для фронтенда
+            }
+        
+        # Для депозитных счетов показываем текущий баланс
+        return {
+            'id': account_id,
+            'name': name,
+            'type': account_type,
+            'subtype': subtype,
+            'current_balance': balances.get('current', 0),
+            'available_balance': balances.get('available', balances.get('current', 0)),
+            'currency': balances['iso_currency_code'],
+            'bank_name': bank_name,
+            'balance_type': 'deposit'  # Тип баланса для фронтенда
+        }
+    
+    @require_connected
     async def get_transactions(self, account_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """
         Получение транзакций с инкрементальным кэшированием
         """
+        # Умное кэширование по датам
+        if not start_date:
+            start_date = datetime.now() - timedelta(days=30)
+        if not end_date:
+            end_date = datetime.now()
+        
+        bank_code = self.bank_code
+        item_id = self.item_id
+        date_range = {
+            'start_date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d')
+        }
+        
+        # Проверяем файловый кэш
+        cached_data = await self.cache_service.get_cached_data(
+            data_type='transactions',
+            bank_code=bank_code,
+            account_id=account_id,
+            item_id=item_id,
+            **date_range
+        )
+        
+        if cached_data and cached_data.get('data'):
+            logger.info("Транзакции получены из кэша для счета %s", account_id)
+            return cached_data['data']
+        
+        # Проверяем лимиты
+        if not await self._check_rate_limit():
+            logger.warning("Используем кэшированные данные из-за лимитов")
+            return await self._get_transactions_fallback(bank_code, account_id)
+        
+        # Запрос к Plaid API (все страницы)
         try:
-            # Умное кэширование по датам
-            if not start_date:
-                start_date = datetime.now() - timedelta(days=30)
-            if not end_date:
-                end_date = datetime.now()
-            
-            bank_code = self.credentials.get('bank_code', 'UNKNOWN')
-            
-            # Проверяем файловый кэш
-            cached_data = await self.cache_service.get_cached_data(
-                data_type='transactions',
-                bank_code=bank_code,
-                account_id=account_id,
-                item_id=self.credentials.get('item_id'),
-                start_date=start_date.strftime('%Y-%m-%d'),
-                end_date=end_date.strftime('%Y-%m-%d')
-            )
-            
-            if cached_data and cached_data.get('data'):
-                logger.info(f"Транзакции получены из кэша для счета {account_id}")
-                return cached_data['data']
-            
-            # Проверяем лимиты
+            transactions = [
+                transaction
+                async for batch in self.iter_transactions(account_id, start_date, end_date)
+                for transaction in batch
+            ]
+        except BankError as e:
+            logger.error("Ошибка получения транзакций Plaid: %s", e)
+            return await self._get_transactions_fallback(bank_code, account_id)
+        
+        await self._store_transactions(account_id, transactions, date_range)
+        
+        logger.info("Получено %d транзакций через Plaid", len(transactions))
+        return transactions
+    
+    async def _store_transactions(self, account_id: str, transactions: List[Dict[str, Any]],
+                                  date_range: Dict[str, str]):
+        """
+        Сохранение транзакций счета в файловый кэш и ссылка на них в fallback
+        """
+        bank_code = self.bank_code
+        item_id = self.item_id
+        
+        # Сохраняем в файловый кэш
+        await self.cache_service.cache_data(
+            data_type='transactions',
+            data=transactions,
+            bank_code=bank_code,
+            account_id=account_id,
+            item_id=item_id,
+            **date_range
+        )
+        
+        # Fallback кэш - ссылка на только что сохраненную запись
+        await self.cache_service.cache_alias(
+            source_data_type='transactions',
+            alias_data_type='transactions_fallback',
+            bank_code=bank_code,
+            account_id=account_id,
+            item_id=item_id,
+            **date_range
+        )
+    
+    async def _get_transactions_fallback(self, bank_code: str, account_id: str) -> List[Dict[str, Any]]:
+        """
+        Последние сохраненные транзакции счета (при лимитах и ошибках Plaid)
+        """
+        fallback_data = await self.cache_service.get_cached_data(
+            data_type='transactions_fallback',
+            bank_code=bank_code,
+            account_id=account_id,
+            item_id=self.item_id
+        )
+        return fallback_data.get('data', []) if fallback_data else []
+    
+    async def iter_transactions(self, account_id: str, start_date: datetime, end_date: datetime,
+                                batch_size: int = _PLAID_TRANSACTIONS_PAGE_SIZE) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Постраничная загрузка транзакций из Plaid (offset/count)
+        
+        Отдает транзакции пачками по batch_size, не накапливая весь период
+        в памяти. Каждая страница - отдельный запрос к Plaid. Кэш не
+        используется, для кэшированного результата вызывайте get_transactions.
+        """
+        async for batch in self._iter_transaction_pages([account_id], start_date, end_date, batch_size):
+            yield batch
+    
+    async def _iter_transaction_pages(self, account_ids: List[str], start_date: datetime, end_date: datetime,
+                                      batch_size: int = _PLAID_TRANSACTIONS_PAGE_SIZE) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Постраничная загрузка транзакций сразу по нескольким счетам item
+        
+        Plaid фильтрует по списку account_ids в одном /transactions/get,
+        транзакции разных счетов идут на общих страницах.
+        """
+        if not self.is_connected:
+            raise ConnectionError(f"Нет подключения к {self.bank_name}")
+        
+        access_token = self.access_token
+        if not access_token:
+            raise AuthenticationError("Access token не найден")
+        
+        offset = 0
+        while True:
             if not await self._check_rate_limit():
-                logger.warning("Используем кэшированные данные из-за лимитов")
-                # Пытаемся получить любые кэшированные транзакции
-                fallback_data = await self.cache_service.get_cached_data(
-                    data_type='transactions_fallback',
-                    bank_code=bank_code,
-                    account_id=account_id,
-                    item_id=self.credentials.get('item_id')
-                )
-                return fallback_data.get('data', []) if fallback_data else []
-            
-            # Получаем access_token
-            access_token = self.credentials.get('access_token')
-            if not access_token:
-                raise AuthenticationError("Access token не найден")
+                raise DataError("Превышен лимит запросов к Plaid API")
             
-            # Запрос к Plaid API
-            options = TransactionsGetRequestOptions(account_ids=[account_id])
+            options = TransactionsGetRequestOptions(account_ids=account_ids, count=batch_size, offset=offset)
             request = TransactionsGetRequest(
                 access_token=access_token,
                 start_date=start_date,
                 end_date=end_date,
                 options=options
             )
-            response = self.client.transactions_get(request)
+            response = await self._call_plaid('transactions_get', request)
             
-            await self._increment_request_count()
-            
-            # Обработка ответа
-            transactions = []
-            for transaction in response['transactions']:
-                transactions.append({
-                    'id': transaction['transaction_id'],
-                    'amount': transaction['amount'],
-                    'name': transaction['name'],
-                    'date': transaction['date'],
-                    'category': transaction.get('category', ['Uncategorized']),
-                    'account_id': account_id,
-                    'currency': transaction.get('iso_currency_code', 'USD')
-                })
+            page = response['transactions']
+            if page:
+                yield [_format_transaction(transaction) for transaction in page]
             
-            # Сохраняем в файловый кэш
-            await self.cache_service.cache_data(
+            offset += len(page)
+            if not page or offset >= response['total_transactions']:
+                break
+    
+    async def get_transactions_bulk(self, account_ids: List[str], start_date: Optional[datetime] = None,
+                                    end_date: Optional[datetime] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Получение транзакций по нескольким счетам
+        
+        Кэш проверяется по каждому счету, а все счета без кэша загружаются
+        одним постраничным /transactions/get со списком account_ids вместо
+        отдельного запроса на каждый счет.
+        
+        Returns:
+            Словарь account_id -> список транзакций
+        """
+        if not start_date:
+            start_date = datetime.now() - timedelta(days=30)
+        if not end_date:
+            end_date = datetime.now()
+        
+        bank_code = self.bank_code
+        item_id = self.item_id
+        date_range = {
+            'start_date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d')
+        }
+        
+        cached = await gather_with_concurrency(
+            _PLAID_BULK_CONCURRENCY,
+            *(self.cache_service.get_cached_data(
                 data_type='transactions',
-                data=transactions,
                 bank_code=bank_code,
                 account_id=account_id,
-                item_id=self.credentials.get('item_id'),
-                start_date=start_date.strftime('%Y-%m-%d'),
-                end_date=end_date.strftime('%Y-%m-%d')
-            )
-            
-            # Сохраняем fallback кэш
-            await self.cache_service.cache_data(
-                data_type='transactions_fallback',
-                data=transactions,
-                bank_code=bank_code,
-                account_id=account_id,
-                item_id=self.credentials.get('item_id')
+                item_id=item_id,
+                **date_range
+            ) for account_id in account_ids)
+        )
+        
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        missing = []
+        for account_id, cached_data in zip(account_ids, cached):
+            if cached_data and cached_data.get('data'):
+                results[account_id] = cached_data['data']
+            else:
+                missing.append(account_id)
+        
+        if not missing:
+            return results
+        
+        fetched: Dict[str, List[Dict[str, Any]]] = {account_id: [] for account_id in missing}
+        try:
+            async for batch in self._iter_transaction_pages(missing, start_date, end_date):
+                for transaction in batch:
+                    fetched[transaction['account_id']].append(transaction)
+        except BankError as e:
+            logger.error("Ошибка получения транзакций Plaid: %s", e)
+            fallbacks = await gather_with_concurrency(
+                _PLAID_BULK_CONCURRENCY,
+                *(self._get_transactions_fallback(bank_code, account_id) for account_id in missing)
             )
-            
-            logger.info(f"Получено {len(transactions)} транзакций через Plaid")
-            return transactions
-            
-        except Exception as e:
-            logger.error(f"Ошибка получения транзакций Plaid: {e}")
-            # Пытаемся получить fallback данные из файлового кэша
-            try:
-                fallback_data = await self.cache_service.get_cached_data(
-                    data_type='transactions_fallback',
-                    bank_code=bank_code,
-                    account_id=account_id,
-                    item_id=self.credentials.get('item_id')
-                )
-                return fallback_data.get('data', []) if fallback_data else []
-            except Exception as fallback_error:
-                logger.error(f"Ошибка получения fallback данных: {fallback_error}")
-                return []
+            results.update(zip(missing, fallbacks))
+            return {account_id: results[account_id] for account_id in account_ids}
+        
+        await gather_with_concurrency(
+            _PLAID_BULK_CONCURRENCY,
+            *(self._store_transactions(account_id, transactions, date_range)
+              for account_id, transactions in fetched.items())
+        )
+        
+        logger.info("Получено %d транзакций через Plaid по %d счетам",
+                    sum(map(len, fetched.values())), len(missing))
+        results.update(fetched)
+        return {account_id: results[account_id] for account_id in account_ids}
     
-    async def get_incremental_transactions(self, account_id: str, last_update: datetime) -> List[Dict[str, Any]]:
+    async def get_incremental_transactions(self, account_id: str,
+                                           last_update: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """
         Получение только новых транзакций с последнего обновления
+        
+        Использует /transactions/sync: Plaid возвращает только транзакции,
+        добавленные после сохраненного курсора. Курсор общий для всего item,
+        поэтому новые транзакции других счетов откладываются в кэш и
+        отдаются при следующем запросе для этих счетов.
+        
+        last_update не используется - место продолжения задает курсор.
+        Отдаются только добавленные транзакции: измененные (modified) и
+        удаленные (removed) Plaid не обрабатываются.
         """
         try:
-            bank_code = self.credentials.get('bank_code', 'UNKNOWN')
+            access_token = self.access_token
+            if not access_token:
+                raise AuthenticationError("Access token не найден")
             
-            # Получаем инкрементальные данные из кэша
-            incremental_data = await self.cache_service.get_incremental_data(
-                data_type='transactions',
+            item_id = self.item_id
+            bank_code = self.bank_code
+            
+            pending = await self.cache_service.get_cached_data(
+                data_type='tx_sync_pending',
                 bank_code=bank_code,
-                last_update=last_update
+                account_id=account_id,
+                item_id=item_id
             )
+            transactions = pending.get('data', []) if pending else []
+            
+            cursor_data = await self.cache_service.get_cached_data(data_type='tx_cursor', item_id=item_id)
+            cursor = cursor_data.get('data') if cursor_data else None
             
-            if incremental_data and incremental_data.get('data'):
-                logger.info(f"Получено {incremental_data['count']} новых транзакций из кэша")
-                return incremental_data['data']
+            # Первый запуск без курсора возвращает всю историю постранично
+            added = []
+            has_more = True
+            rate_limited = False
+            while has_more:
+                # Лимит проверяем перед каждой страницей; при исчерпании курсор
+                # не сохраняем - следующий sync начнет с того же места
+                if not await self._check_rate_limit():
+                    rate_limited = True
+                    break
+                if cursor:
+                    request = TransactionsSyncRequest(access_token=access_token, cursor=cursor)
+                else:
+                    request = TransactionsSyncRequest(access_token=access_token)
+                response = await self._call_plaid('transactions_sync', request)
+                added.extend(response['added'])
+                cursor = response['next_cursor']
+                has_more = response['has_more']
             
-            # Если нет инкрементальных данных, получаем все транзакции
-            logger.info("Инкрементальных данных нет, загружаем все транзакции")
-            return await self.get_transactions(account_id)
+            if rate_limited:
+                logger.warning("Используем отложенные транзакции из-за лимитов")
+            else:
+                # Раскладываем новые транзакции по счетам
+                by_account: Dict[str, List[Dict[str, Any]]] = {}
+                for transaction in added:
+                    row = _format_transaction(transaction)
+                    by_account.setdefault(row['account_id'], []).append(row)
+                
+                own_transactions = by_account.pop(account_id, [])
+                if await self._commit_sync(item_id, cursor, by_account):
+                    known_ids = {row['id'] for row in transactions}
+                    transactions.extend(row for row in own_transactions if row['id'] not in known_ids)
+                else:
+                    # Курсор не сдвинут - эти транзакции придут при следующем sync
+                    logger.warning("Не удалось сохранить результат transactions/sync для %s", item_id)
             
         except Exception as e:
-            logger.error(f"Ошибка инкрементальной загрузки транзакций: {e}")
+            # Курсор не сдвинут - новые транзакции придут при следующем sync
+            logger.error("Ошибка инкрементальной загрузки транзакций: %s", e)
             return []
+        
+        # Отложенные транзакции лежат до сохраненного курсора и повторно
+        # не придут - отдаем их один раз
+        if pending:
+            cleared = await self.cache_service.cache_data(
+                data_type='tx_sync_pending',
+                data=[],
+                bank_code=bank_code,
+                account_id=account_id,
+                item_id=item_id
+            )
+            if not cleared:
+                logger.warning("Не удалось очистить отложенные транзакции счета %s", account_id)
+        
+        logger.info("Получено %d новых транзакций через Plaid sync", len(transactions))
+        return transactions
+    
+    async def _commit_sync(self, item_id: str, cursor: str,
+                           by_account: Dict[str, List[Dict[str, Any]]]) -> bool:
+        """
+        Откладывает транзакции других счетов и сохраняет курсор sync
+        
+        Курсор сохраняется последним. Если что-то не записалось, отложенные
+        транзакции возвращаются к прежнему состоянию: следующий sync повторит
+        те же транзакции, и ни одна не будет отдана дважды.
+        """
+        bank_code = self.bank_code
+        previous: Dict[str, List[Dict[str, Any]]] = {}
+        committed = True
+        
+        for other_account_id, other_transactions in by_account.items():
+            other_pending = await self.cache_service.get_cached_data(
+                data_type='tx_sync_pending',
+                bank_code=bank_code,
+                account_id=other_account_id,
+                item_id=item_id
+            )
+            known = other_pending.get('data', []) if other_pending else []
+            previous[other_account_id] = known
+            known_ids = {row['id'] for row in known}
+            committed = await self.cache_service.cache_data(
+                data_type='tx_sync_pending',
+                data=known + [row for row in other_transactions if row['id'] not in known_ids],
+                bank_code=bank_code,
+                account_id=other_account_id,
+                item_id=item_id
+            )
+            if not committed:
+                logger.warning("Не удалось отложить транзакции счета %s", other_account_id)
+                break
+        
+        if committed:
+            committed = await self.cache_service.cache_data(data_type='tx_cursor', data=cursor, item_id=item_id)
+            if committed:
+                return True
+        
+        for other_account_id, known in previous.items():
+            restored = await self.cache_service.cache_data(
+                data_type='tx_sync_pending',
+                data=known,
+                bank_code=bank_code,
+                account_id=other_account_id,
+                item_id=item_id
+            )
+            if not restored:
+                logger.error("Не удалось откатить отложенные транзакции счета %s", other_account_id)
+        return False
     
+    async def _get_accounts_index(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Индекс балансов счетов item (account_id -> баланс)
+        
+        Устаревший индекс отдается сразу и обновляется в фоне. Возвращает
+        None, если индекса нет, а месячный лимит запросов исчерпан.
+        """
+        access_token = self.access_token
+        if not access_token:
+            raise AuthenticationError("Access token не найден")
+        
+        # Проверяем кэш: устаревшие балансы отдаем сразу и обновляем в фоне
+        entry = self._get_cached_entry("accounts_indexed")
+        if entry is not None:
+            accounts, is_stale = entry
+            if is_stale:
+                self._schedule_accounts_refresh(access_token)
+            return accounts
+        
+        # Проверяем лимиты
+        if not await self._check_rate_limit():
+            return None
+        
+        return await self._fetch_all_accounts_indexed(access_token)
+    
+    @require_connected
     async def get_balance(self, account_id: str) -> Dict[str, Any]:
         """
         Получение баланса с кэшированием
+        
+        Балансы всех счетов item берутся одним запросом accounts_get и
+        кэшируются по account_id, поэтому запросы баланса для N счетов
+        расходуют один запрос к Plaid, а не N.
         """
         try:
-            cache_key = f"balance_{account_id}"
-            
-            # Проверяем кэш
-            cached_balance = await self._get_cached_data(cache_key)
-            if cached_balance:
-                return cached_balance
-            
-            # Проверяем лимиты
-            if not await self._check_rate_limit():
+            accounts = await self._get_accounts_index()
+            if accounts is None:
                 logger.warning("Используем кэшированные данные из-за лимитов")
                 return await self._get_cached_data("balance_fallback") or {}
             
-            # Получаем access_token
-            access_token = self.credentials.get('access_token')
-            if not access_token:
-                raise AuthenticationError("Access token не найден")
-            
-            # Запрос к Plaid API
-            request = AccountsGetRequest(access_token=access_token)
-            response = self.client.accounts_get(request)
-            
-            await self._increment_request_count()
-            
-            # Находим нужный счет
-            for account in response['accounts']:
-                if account['account_id'] == account_id:
-                    balance_data = {
-                        'account_id': account_id,
-                        'current_balance': account['balances']['current'],
-                        'available_balance': account['balances']['available'],
-                        'currency': account['balances']['iso_currency_code'],
-                        'last_updated': datetime.now().isoformat()
-                    }
-                    
-                    # Сохраняем в кэш
-                    await self._cache_data(cache_key, balance_data)
-                    await self._cache_data("balance_fallback", balance_data)
-                    
-                    return balance_data
+            balance_data = accounts.get(account_id)
+            if balance_data:
+                await self._cache_data("balance_fallback", balance_data)
+                return balance_data
             
             return {}
             
         except Exception as e:
-            logger.error(f"Ошибка получения баланса Plaid: {e}")
+            logger.error("Ошибка получения баланса Plaid: %s", e)
             return await self._get_cached_data("balance_fallback") or {}
     
+    @require_connected
+    async def get_balances(self, account_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Балансы нескольких счетов за один проход
+        
+        Индекс счетов получается один раз (из кэша или одним accounts_get)
+        и общий для всех account_ids.
+        
+        Returns:
+            Словарь account_id -> баланс (пустой словарь для неизвестного счета)
+        """
+        try:
+            accounts = await self._get_accounts_index()
+            if accounts is None:
+                logger.warning("Балансы недоступны: исчерпан лимит запросов Plaid")
+                accounts = {}
+        except Exception as e:
+            logger.error("Ошибка получения балансов Plaid: %s", e)
+            accounts = {}
+        
+        return {account_id: accounts.get(account_id, {}) for account_id in account_ids}
+    
+    def _schedule_accounts_refresh(self, access_token: str):
+        """
+        Фоновое обновление балансов (не более одного на access_token)
+        """
+        if access_token in _accounts_refreshing:
+            return
+        _accounts_refreshing.add(access_token)
+        task = asyncio.create_task(self._refresh_accounts_bg(access_token))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    
+    async def _refresh_accounts_bg(self, access_token: str):
+        """
+        Обновление устаревших балансов вне пользовательского запроса
+        """
+        try:
+            if not await self._check_rate_limit():
+                return
+            await self._fetch_all_accounts_indexed(access_token, refresh=True)
+        except BankError as e:
+            logger.warning("Не удалось обновить балансы Plaid в фоне: %s", e)
+        finally:
+            _accounts_refreshing.discard(access_token)
+    
+    async def _fetch_all_accounts_indexed(self, access_token: str,
+                                          refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Балансы всех счетов item, проиндексированные по account_id
+        
+        Конкурентные вызовы для одного access_token ждут один общий запрос
+        accounts_get (single-flight) и затем читают результат из кэша.
+        При refresh=True запрос выполняется, даже если кэш еще актуален.
+        """
+        lock = _accounts_locks.setdefault(access_token, asyncio.Lock())
+        async with lock:
+            accounts = None if refresh else await self._get_cached_data("accounts_indexed")
+            if accounts is not None:
+                return accounts
+            
+            response = await self._call_plaid('accounts_get', self._accounts_request)
+            
+            last_updated = datetime.now().isoformat()
+            accounts = {
+                account['account_id']: {
+                    'account_id': account['account_id'],
+                    'current_balance': account['balances']['current'],
+                    'available_balance': account['balances']['available'],
+                    'currency': account['balances']['iso_currency_code'],
+                    'last_updated': last_updated
+                }
+                for account in response['accounts']
+            }
+            
+            await self._cache_data("accounts_indexed", accounts)
+            return accounts
+    
     async def get_institution_info(self, institution_id: str) -> Dict[str, Any]:
         """
         Получение информации об учреждении
+        
+        Данные об учреждениях меняются редко, поэтому хранятся в файловом кэше
+        (TTL типа 'institution' - 24 часа). Сброс: /cache/invalidate?data_type=institution
         """
         try:
-            cache_key = f"institution_{institution_id}"
-            
-            # Проверяем кэш
-            cached_info = await self._get_cached_data(cache_key)
-            if cached_info:
-                return cached_info
+            # Проверяем файловый кэш
+            cached_info = await self.cache_service.get_cached_data(
+                data_type='institution',
+                institution_id=institution_id
+            )
+            if cached_info and cached_info.get('data'):
+                return cached_info['data']
             
             # Проверяем лимиты
             if not await self._check_rate_limit():
@@ -445,77 +1082,84 @@ class PlaidBankConnector(BankConnector):
                 institution_id=institution_id,
                 country_codes=[CountryCode('US')]
             )
-            response = self.client.institutions_get_by_id(request)
-            
-            await self._increment_request_count()
+            response = await self._call_plaid('institutions_get_by_id', request)
             
             # Обработка ответа
             institution_info = {
                 'institution_id': response['institution']['institution_id'],
                 'name': response['institution']['name'],
-                'products': response['institution']['products'],
-                'country_codes': response['institution']['country_codes'],
+                'products': [str(product) for product in response['institution']['products']],
+                'country_codes': [str(code) for code in response['institution']['country_codes']],
                 'url': response['institution'].get('url'),
                 'logo': response['institution'].get('logo')
             }
             
-            # Сохраняем в кэш
-            await self._cache_data(cache_key, institution_info)
+            # Сохраняем в файловый кэш
+            await self.cache_service.cache_data(
+                data_type='institution',
+                data=institution_info,
+                institution_id=institution_id
+            )
             await self._cache_data("institution_fallback", institution_info)
             
             return institution_info
             
         except Exception as e:
-            logger.error(f"Ошибка получения информации об учреждении: {e}")
+            logger.error("Ошибка получения информации об учреждении: %s", e)
             return await self._get_cached_data("institution_fallback") or {}
     
-    async def get_rate_limit_status(self) -> Dict[str, Any]:
+    async def _check_plaid_availability(self) -> bool:
         """
-        Получение статуса лимитов запросов с реальными данными Plaid
+        Проверка доступности Plaid с кэшированием результата
+        
+        Результат хранится на уровне модуля: положительный - 15 секунд,
+        отрицательный - 5 секунд. Частые опросы статуса не создают
+        новых запросов к Plaid.
         """
-        global _global_request_count, _global_monthly_cache
+        global _plaid_probe
         
-        current_month = datetime.now().strftime('%Y-%m')
-        month_key = f"requests_{current_month}"
+        now = time.monotonic()
+        if _plaid_probe is not None and now < _plaid_probe[0]:
+            return _plaid_probe[1]
         
-        # Получаем реальные данные о лимитах из Plaid API
         try:
-            # Используем institution endpoint для получения реальных лимитов
-            institution_request = plaid.model.institutions_get_by_id_request.InstitutionsGetByIdRequest(
-                institution_id="ins_37",  # CIBC institution ID
-                country_codes=[CountryCode("CA")]
+            # Используем institution endpoint для проверки доступности
+            institution_response = await self._call_plaid(
+                'institutions_get_by_id', _PLAID_PROBE_REQUEST, count_request=False
             )
-            
-            institution_response = self.client.institutions_get_by_id(institution_request)
-            
-            # Получаем информацию о лимитах (если доступно)
-            monthly_limit = 100  # Стандартный лимит для production
-            requests_used = _global_monthly_cache.get(month_key, 0)
-            
-            # Если у нас есть реальные данные о запросах, используем их
-            if hasattr(institution_response, 'institution') and institution_response.institution:
-                # Здесь можно добавить логику получения реальных лимитов
-                # если Plaid API предоставляет такую информацию
-                pass
-                
+            available = bool(getattr(institution_response, 'institution', None))
         except Exception as e:
-            logger.warning(f"Не удалось получить реальные лимиты Plaid: {e}")
-            # Fallback к локальному счетчику
-            monthly_limit = 100
-            requests_used = _global_monthly_cache.get(month_key, 0)
+            logger.warning("Не удалось получить реальные лимиты Plaid: %s", e)
+            available = False
+        
+        ttl = _PLAID_PROBE_TTL if available else _PLAID_PROBE_NEGATIVE_TTL
+        _plaid_probe = (time.monotonic() + ttl, available)
+        return available
+    
+    async def get_rate_limit_status(self, probe: bool = True) -> Dict[str, Any]:
+        """
+        Получение статуса лимитов запросов с реальными данными Plaid
         
-        # Корректируем счетчик если он показывает 0, но мы знаем что делали запросы
-        if requests_used == 0 and _global_request_count > 0:
-            requests_used = min(_global_request_count, monthly_limit)
+        При probe=False читается только локальный счетчик, без проверки доступности
+        Plaid (plaid_available в ответе будет None)
+        """
+        await self._restore_request_count()
+        
+        current_month = _current_month()
+        month_key = f"requests_{current_month}"
+        
+        plaid_available = await self._check_plaid_availability() if probe else None
+        
+        # Plaid не сообщает лимиты через API - используем локальный счетчик
+        monthly_limit = 100  # Стандартный лимит для production
+        requests_used = _global_monthly_cache.get(month_key, 0)
         
         requests_remaining = max(0, monthly_limit - requests_used)
         usage_percentage = (requests_used / monthly_limit) * 100
         
-        # Вычисляем дату сброса (первое число следующего месяца)
-        next_month = datetime.now().replace(day=1) + timedelta(days=32)
-        reset_date = next_month.replace(day=1).strftime('%Y-%m-%d')
+        reset_date = _reset_date(current_month)
         
-        logger.info(f"Статус лимитов Plaid: {requests_used}/{monthly_limit} ({usage_percentage:.1f}%)")
+        logger.info("Статус лимитов Plaid: %s/%s (%.1f%%)", requests_used, monthly_limit, usage_percentage)
         
         return {
             'monthly_limit': monthly_limit,
@@ -524,6 +1168,7 @@ class PlaidBankConnector(BankConnector):
             'usage_percentage': usage_percentage,
             'reset_date': reset_date,
             'is_real_data': True,  # Флаг что данные актуальные
+            'plaid_available': plaid_available,
             'last_updated': datetime.now().isoformat()
         }
     
@@ -534,7 +1179,7 @@ class PlaidBankConnector(BankConnector):
         optimization_tips = []
         
         # Анализ использования кэша
-        cache_hit_rate = len([k for k, v in self.cache.items() if isinstance(v, tuple) and len(v) == 2]) / max(1, self.request_count)
+        cache_hit_rate = _cache_hits / max(1, _cache_hits + _cache_misses)
         
         if cache_hit_rate < 0.5:
             optimization_tips.append("Увеличьте время кэширования для часто запрашиваемых данных")
@@ -543,12 +1188,29 @@ class PlaidBankConnector(BankConnector):
         if self.request_count > self.monthly_limit * 0.8:
             optimization_tips.append("Сократите частоту запросов - приближаетесь к лимиту")
         
+        # Рекомендации по статистике вызовов Plaid
+        total_calls = sum(stats['calls'] for stats in _plaid_call_stats.values())
+        for endpoint, stats in _plaid_call_stats.items():
+            if total_calls >= 10 and stats['calls'] / total_calls > 0.5:
+                optimization_tips.append(
+                    f"Больше половины запросов - {endpoint} ({stats['calls']} из {total_calls}): кэшируйте его результаты"
+                )
+            if stats['errors'] / stats['calls'] > 0.1:
+                optimization_tips.append(
+                    f"Много ошибок {endpoint} ({stats['errors']} из {stats['calls']}): проверьте токены и доступность банка"
+                )
+            if stats['total_seconds'] / stats['calls'] > 1.0:
+                optimization_tips.append(
+                    f"Медленные ответы {endpoint} (в среднем {stats['total_seconds'] / stats['calls']:.1f} с): запрашивайте реже и в фоне"
+                )
+        
         # Рекомендации по группировке запросов
         optimization_tips.append("Группируйте запросы по счетам для экономии лимитов")
         optimization_tips.append("Используйте webhooks для обновлений в реальном времени")
         
         return {
             'cache_hit_rate': cache_hit_rate,
+            'endpoint_stats': {endpoint: dict(stats) for endpoint, stats in _plaid_call_stats.items()},
             'optimization_tips': optimization_tips,
             'recommended_cache_ttl': 600 if cache_hit_rate < 0.3 else 300
         }
@@ -558,7 +1220,7 @@ class PlaidBankConnector(BankConnector):
         Обмен public_token на access_token через Plaid API
         """
         try:
-            logger.info(f"Обмен public_token на access_token")
+            logger.info("Обмен public_token на access_token")
             
             # Импортируем необходимые модели Plaid
             from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
@@ -569,7 +1231,9 @@ class PlaidBankConnector(BankConnector):
             )
             
             # Выполняем обмен токена
-            response = self.client.item_public_token_exchange(request)
+            response = await self._call_plaid(
+                'item_public_token_exchange', request, count_request=False, retry=False
+            )
             
             if response and response.access_token:
                 logger.info("Токен успешно обменян")
@@ -579,5 +1243,5 @@ class PlaidBankConnector(BankConnector):
                 return None
                 
         except Exception as e:
-            logger.error(f"Ошибка обмена токена: {e}")
+            logger.error("Ошибка обмена токена: %s", e)
             return None
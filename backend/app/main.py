@@ -9,8 +9,12 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from contextlib import asynccontextmanager
 import logging
+import logging.handlers
+import queue
+import atexit
 import uvicorn
 import sys
+import os
 import asyncio
 
 # --- Windows-specific event loop policy fix for UVicorn reload ---
@@ -19,11 +23,18 @@ if sys.platform == "win32":
 
 # --- Logging Configuration ---
 # Must be configured BEFORE other modules are imported.
+# Records are put on a queue; writing to stdout happens in a background
+# QueueListener thread so a slow log collector never blocks the event loop.
+# Level is taken from LOG_LEVEL (e.g. WARNING in production).
+_log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    stream=sys.stdout,
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
 )
+log_listener.start()
+atexit.register(log_listener.stop)
 # --- End of Logging Configuration ---
 
 # Импорты модулей
@@ -35,6 +46,7 @@ from .services.ai_service import AIService
 from .api.bank_management import router as bank_management_router
 from .api.cache_management import router as cache_management_router
 from .api.plaid_link import router as plaid_link_router
+from .banks.plaid_integration import close_api_clients
 
 # Настройка логирования
 # logging.basicConfig(level=logging.INFO) # This is now at the top of the file
@@ -52,7 +64,7 @@ async def lifespan(app: FastAPI):
     # Проверка подключения к базе данных
     health = await db.health_check()
     if health["status"] != "healthy":
-        logger.error(f"Ошибка подключения к базе данных: {health}")
+        logger.error("Ошибка подключения к базе данных: %s", health)
         raise Exception("Не удалось подключиться к базе данных")
     
     logger.info("Приложение успешно запущено")
@@ -62,6 +74,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Завершение работы приложения...")
     await db.close_all_connections()
+    close_api_clients()
     logger.info("Приложение остановлено")
 
 
@@ -83,7 +96,6 @@ app.add_middleware(
 )
 
 # Подключение статических файлов
-import os
 static_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..")
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
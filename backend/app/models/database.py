@@ -95,7 +95,7 @@ class Database:
             yield connection
             
         except Exception as e:
-            logger.error(f"Ошибка работы с базой данных: {e}")
+            logger.error("Ошибка работы с базой данных: %s", e)
             if connection:
                 connection.rollback()
             raise
@@ -109,7 +109,7 @@ class Database:
                         else:
                             connection.close()
                 except Exception as e:
-                    logger.error(f"Ошибка при возврате подключения в пул: {e}")
+                    logger.error("Ошибка при возврате подключения в пул: %s", e)
                     try:
                         connection.close()
                     except:
@@ -129,13 +129,13 @@ class Database:
         async with self.get_connection() as conn:
             cursor = conn.cursor()
             try:
-                logger.debug(f"Executing query: {query} with params: {params}")
+                logger.debug("Executing query: %s with params: %s", query, params)
                 cursor.execute(query, params)
                 
                 # Если это изменяющий запрос, коммитим его
                 if query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE')):
                     conn.commit()
-                    logger.info(f"Query committed successfully. Row count: {cursor.rowcount}")
+                    logger.info("Query committed successfully. Row count: %s", cursor.rowcount)
 
                 # Если есть что возвращать (RETURNING), то возвращаем
                 if cursor.description:
@@ -143,7 +143,7 @@ class Database:
                     return [dict(row) for row in results]
                 return []
             except Exception as e:
-                logger.error(f"Error executing query: {query} - {e}")
+                logger.error("Error executing query: %s - %s", query, e)
                 conn.rollback()
                 raise
             finally:
@@ -251,7 +251,7 @@ class Database:
                 if not connection.closed:
                     connection.close()
             except Exception as e:
-                logger.error(f"Ошибка при закрытии подключения: {e}")
+                logger.error("Ошибка при закрытии подключения: %s", e)
         
         self._connection_pool.clear()
         logger.info("Все подключения к базе данных закрыты")
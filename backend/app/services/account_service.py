@@ -39,7 +39,7 @@ class AccountService:
             return Account(**result[0])
             
         except Exception as e:
-            logger.error(f"Ошибка создания счета: {e}")
+            logger.error("Ошибка создания счета: %s", e)
             raise
     
     async def get_all_accounts(self) -> List[AccountWithBank]:
@@ -56,7 +56,7 @@ class AccountService:
             return [AccountWithBank(**row) for row in result]
             
         except Exception as e:
-            logger.error(f"Ошибка получения счетов: {e}")
+            logger.error("Ошибка получения счетов: %s", e)
             raise
     
     async def get_balance_report(self) -> Dict[str, Any]:
@@ -79,7 +79,7 @@ class AccountService:
             return {"balance_report": result}
             
         except Exception as e:
-            logger.error(f"Ошибка получения отчета по балансам: {e}")
+            logger.error("Ошибка получения отчета по балансам: %s", e)
             raise
 
 
@@ -52,7 +52,7 @@ class AIService:
             categorized_count = sum(1 for t in categorized if t.get("category") and t["category"] != "Другое")
             total_count = len(categorized)
             
-            logger.info(f"Категоризировано {categorized_count} из {total_count} транзакций")
+            logger.info("Категоризировано %s из %s транзакций", categorized_count, total_count)
             
             return {
                 "message": "Категоризация завершена",
@@ -62,7 +62,7 @@ class AIService:
             }
             
         except Exception as e:
-            logger.error(f"Ошибка AI категоризации: {e}")
+            logger.error("Ошибка AI категоризации: %s", e)
             raise
     
     async def analyze_financial_health(self) -> Dict[str, Any]:
@@ -91,7 +91,7 @@ class AIService:
             return analysis
             
         except Exception as e:
-            logger.error(f"Ошибка анализа финансового здоровья: {e}")
+            logger.error("Ошибка анализа финансового здоровья: %s", e)
             raise
     
     async def get_financial_advice(self) -> Dict[str, Any]:
@@ -119,7 +119,7 @@ class AIService:
             }
             
         except Exception as e:
-            logger.error(f"Ошибка получения рекомендаций: {e}")
+            logger.error("Ошибка получения рекомендаций: %s", e)
             raise
     
     async def learn_from_feedback(self, feedback_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -141,7 +141,7 @@ class AIService:
             }
             
         except Exception as e:
-            logger.error(f"Ошибка обучения AI: {e}")
+            logger.error("Ошибка обучения AI: %s", e)
             raise
     
     async def get_spending_analysis(self, period_days: int = 30) -> Dict[str, Any]:
@@ -165,7 +165,7 @@ class AIService:
             return analysis
             
         except Exception as e:
-            logger.error(f"Ошибка анализа расходов: {e}")
+            logger.error("Ошибка анализа расходов: %s", e)
             raise
     
     async def get_income_analysis(self, period_days: int = 30) -> Dict[str, Any]:
@@ -189,7 +189,7 @@ class AIService:
             return analysis
             
         except Exception as e:
-            logger.error(f"Ошибка анализа доходов: {e}")
+            logger.error("Ошибка анализа доходов: %s", e)
             raise
 
 
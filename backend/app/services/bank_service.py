@@ -23,7 +23,7 @@ class BankService:
                 return []
             return [Bank(**bank) for bank in banks_data]
         except Exception as e:
-            logger.error(f"Error getting all banks: {e}")
+            logger.error("Error getting all banks: %s", e)
             return []
 
     async def create_bank(self, bank: BankCreate) -> Optional[Bank]:
@@ -47,7 +47,7 @@ class BankService:
                 return Bank(**created_bank_data_list[0])
             return None
         except Exception as e:
-            logger.error(f"Error creating/updating bank {bank.name}: {e}")
+            logger.error("Error creating/updating bank %s: %s", bank.name, e)
             return None
 
     async def get_bank_by_plaid_institution_id(self, plaid_institution_id: str) -> Optional[Bank]:
@@ -59,5 +59,5 @@ class BankService:
                 return Bank(**bank_data_list[0])
             return None
         except Exception as e:
-            logger.error(f"Error getting bank by plaid_institution_id {plaid_institution_id}: {e}")
+            logger.error("Error getting bank by plaid_institution_id %s: %s", plaid_institution_id, e)
             return None
@@ -3,14 +3,24 @@
 Упрощенная версия с файловым кэшем для быстрого тестирования
 """
 
-import json
 import logging
 import os
+import orjson
+import zstandard as zstd
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 
 logger = logging.getLogger(__name__)
 
+# Крупные списки транзакций хранятся сжатыми zstd (transactions_fallback -
+# несжатая ссылка $ref на запись transactions). Расширение файла остается
+# .json: по нему cleanup и статистика находят все записи кэша, а сжатие
+# распознается по сигнатуре zstd при чтении
+_COMPRESSED_TYPES = frozenset({'transactions'})
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_zc = zstd.ZstdCompressor(level=3)
+_zd = zstd.ZstdDecompressor()
+
 class PlaidCacheService:
     """Сервис для управления кэшем Plaid данных (файловая версия)"""
     
@@ -26,7 +36,10 @@ class PlaidCacheService:
             'accounts': 60,      # 1 час
             'transactions': 30,  # 30 минут
             'balance': 15,       # 15 минут
-            'institution': 1440  # 24 часа
+            'institution': 1440,  # 24 часа
+            'tx_cursor': 525600,  # 1 год, курсор /transactions/sync
+            'tx_sync_pending': 525600,  # 1 год, новые транзакции до выдачи
+            'plaid_request_count': 525600  # 1 год, месячный счетчик запросов Plaid
         }
     
     def _get_cache_key(self, data_type: str, bank_code: str = None, 
@@ -51,6 +64,15 @@ class PlaidCacheService:
         """Получение TTL для типа данных"""
         return self.ttl_config.get(data_type, 30)
     
+    @staticmethod
+    def _read_cache_file(path: str) -> Dict[str, Any]:
+        """Чтение и разбор файла кэша (.json может быть сжат zstd - распознается по сигнатуре)"""
+        with open(path, 'rb') as f:
+            payload = f.read()
+        if payload.startswith(_ZSTD_MAGIC):
+            payload = _zd.decompress(payload)
+        return orjson.loads(payload)
+    
     async def get_cached_data(self, data_type: str, bank_code: str = None, 
                             account_id: str = None, item_id: str = None, **kwargs) -> Optional[Dict[str, Any]]:
         """Получение данных из кэша"""
@@ -59,13 +81,15 @@ class PlaidCacheService:
             cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
             
             if os.path.exists(cache_file):
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cached_data = json.load(f)
+                cached_data = self._read_cache_file(cache_file)
                 
                 # Проверяем TTL
                 expires_at = datetime.fromisoformat(cached_data.get('expires_at', ''))
                 if datetime.utcnow() < expires_at:
-                    logger.debug(f"Данные получены из кэша: {cache_key}")
+                    # Псевдоним: читаем основную запись (один уровень ссылки)
+                    if '$ref' in cached_data:
+                        return self._read_alias_target(cached_data['$ref'])
+                    logger.debug("Данные получены из кэша: %s", cache_key)
                     return cached_data
                 else:
                     # Удаляем истекший файл
@@ -74,7 +98,7 @@ class PlaidCacheService:
             return None
             
         except Exception as e:
-            logger.error(f"Ошибка получения данных из кэша: {e}")
+            logger.error("Ошибка получения данных из кэша: %s", e)
             return None
     
     async def cache_data(self, data_type: str, data: Any, bank_code: str = None, 
@@ -98,16 +122,69 @@ class PlaidCacheService:
                 'last_updated': datetime.utcnow().isoformat()
             }
             
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, default=str, ensure_ascii=False, indent=2)
+            if data_type in _COMPRESSED_TYPES:
+                payload = _zc.compress(orjson.dumps(cache_data, default=str))
+            else:
+                payload = orjson.dumps(cache_data, default=str, option=orjson.OPT_INDENT_2)
+            
+            with open(cache_file, 'wb') as f:
+                f.write(payload)
+            
+            logger.debug("Данные сохранены в кэш: %s", cache_key)
+            return True
+            
+        except Exception as e:
+            logger.error("Ошибка сохранения данных в кэш: %s", e)
+            return False
+    
+    async def cache_alias(self, source_data_type: str, alias_data_type: str, bank_code: str = None,
+                         account_id: str = None, item_id: str = None, **kwargs) -> bool:
+        """
+        Сохранение псевдонима на уже закэшированную запись
+        
+        Вместо повторной записи тех же данных сохраняется заглушка
+        {"$ref": <ключ основной записи>}. Дополнительные параметры (kwargs)
+        относятся к ключу основной записи; ключ псевдонима строится без них.
+        """
+        try:
+            source_key = self._get_cache_key(source_data_type, bank_code, account_id, item_id, **kwargs)
+            alias_key = self._get_cache_key(alias_data_type, bank_code, account_id, item_id)
+            expires_at = datetime.utcnow() + timedelta(minutes=self._get_ttl(alias_data_type))
+            
+            alias_data = {
+                '$ref': source_key,
+                'cache_key': alias_key,
+                'data_type': alias_data_type,
+                'bank_code': bank_code,
+                'account_id': account_id,
+                'created_at': datetime.utcnow().isoformat(),
+                'expires_at': expires_at.isoformat(),
+                'last_updated': datetime.utcnow().isoformat()
+            }
+            
+            with open(os.path.join(self.cache_dir, f"{alias_key}.json"), 'wb') as f:
+                f.write(orjson.dumps(alias_data, option=orjson.OPT_INDENT_2))
             
-            logger.debug(f"Данные сохранены в кэш: {cache_key}")
+            logger.debug("Псевдоним сохранен в кэш: %s -> %s", alias_key, source_key)
             return True
             
         except Exception as e:
-            logger.error(f"Ошибка сохранения данных в кэш: {e}")
+            logger.error("Ошибка сохранения псевдонима в кэш: %s", e)
             return False
     
+    def _read_alias_target(self, source_key: str) -> Optional[Dict[str, Any]]:
+        """Чтение основной записи, на которую указывает псевдоним"""
+        source_file = os.path.join(self.cache_dir, f"{source_key}.json")
+        if not os.path.exists(source_file):
+            return None
+        
+        source_data = self._read_cache_file(source_file)
+        if datetime.utcnow() >= datetime.fromisoformat(source_data.get('expires_at', '')):
+            return None
+        
+        logger.debug("Данные получены из кэша по псевдониму: %s", source_key)
+        return source_data
+    
     async def invalidate_cache(self, data_type: str = None, bank_code: str = None, 
                              account_id: str = None) -> int:
         """Очистка кэша по критериям"""
@@ -118,8 +195,7 @@ class PlaidCacheService:
                 if filename.endswith('.json'):
                     filepath = os.path.join(self.cache_dir, filename)
                     try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            cache_data = json.load(f)
+                        cache_data = self._read_cache_file(filepath)
                         
                         should_delete = False
                         if data_type and cache_data.get('data_type') == data_type:
@@ -134,14 +210,14 @@ class PlaidCacheService:
                             deleted_count += 1
                             
                     except Exception as e:
-                        logger.warning(f"Ошибка обработки файла {filename}: {e}")
+                        logger.warning("Ошибка обработки файла %s: %s", filename, e)
                         continue
             
-            logger.info(f"Удалено {deleted_count} записей из кэша")
+            logger.info("Удалено %s записей из кэша", deleted_count)
             return deleted_count
             
         except Exception as e:
-            logger.error(f"Ошибка очистки кэша: {e}")
+            logger.error("Ошибка очистки кэша: %s", e)
             return 0
     
     async def cleanup_expired(self) -> int:
@@ -154,8 +230,7 @@ class PlaidCacheService:
                 if filename.endswith('.json'):
                     filepath = os.path.join(self.cache_dir, filename)
                     try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            cache_data = json.load(f)
+                        cache_data = self._read_cache_file(filepath)
                         
                         expires_at = datetime.fromisoformat(cache_data.get('expires_at', ''))
                         if current_time > expires_at:
@@ -163,14 +238,14 @@ class PlaidCacheService:
                             deleted_count += 1
                             
                     except Exception as e:
-                        logger.warning(f"Ошибка обработки файла {filename}: {e}")
+                        logger.warning("Ошибка обработки файла %s: %s", filename, e)
                         continue
             
-            logger.info(f"Удалено {deleted_count} истекших записей из кэша")
+            logger.info("Удалено %s истекших записей из кэша", deleted_count)
             return deleted_count
             
         except Exception as e:
-            logger.error(f"Ошибка очистки истекших записей: {e}")
+            logger.error("Ошибка очистки истекших записей: %s", e)
             return 0
     
     async def get_cache_stats(self) -> Dict[str, Any]:
@@ -187,8 +262,7 @@ class PlaidCacheService:
                 if filename.endswith('.json'):
                     filepath = os.path.join(self.cache_dir, filename)
                     try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            cache_data = json.load(f)
+                        cache_data = self._read_cache_file(filepath)
                         
                         total_items += 1
                         data_type = cache_data.get('data_type', 'unknown')
@@ -200,7 +274,7 @@ class PlaidCacheService:
                             expired_items += 1
                             
                     except Exception as e:
-                        logger.warning(f"Ошибка обработки файла {filename}: {e}")
+                        logger.warning("Ошибка обработки файла %s: %s", filename, e)
                         continue
             
             return {
@@ -212,7 +286,7 @@ class PlaidCacheService:
             }
             
         except Exception as e:
-            logger.error(f"Ошибка получения статистики кэша: {e}")
+            logger.error("Ошибка получения статистики кэша: %s", e)
             return {}
     
     async def get_incremental_data(self, data_type: str, bank_code: str, 
@@ -226,8 +300,7 @@ class PlaidCacheService:
                 if filename.endswith('.json'):
                     filepath = os.path.join(self.cache_dir, filename)
                     try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            cache_data = json.load(f)
+                        cache_data = self._read_cache_file(filepath)
                         
                         if (cache_data.get('data_type') == data_type and 
                             cache_data.get('bank_code') == bank_code):
@@ -246,7 +319,7 @@ class PlaidCacheService:
                                     max_last_update = last_updated
                                     
                     except Exception as e:
-                        logger.warning(f"Ошибка обработки файла {filename}: {e}")
+                        logger.warning("Ошибка обработки файла %s: %s", filename, e)
                         continue
             
             if incremental_data:
@@ -259,5 +332,5 @@ class PlaidCacheService:
             return None
             
         except Exception as e:
-            logger.error(f"Ошибка получения инкрементальных данных: {e}")
+            logger.error("Ошибка получения инкрементальных данных: %s", e)
             return None
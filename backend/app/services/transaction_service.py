@@ -40,7 +40,7 @@ class TransactionService:
             return Transaction(**result[0])
             
         except Exception as e:
-            logger.error(f"Ошибка создания транзакции: {e}")
+            logger.error("Ошибка создания транзакции: %s", e)
             raise
     
     async def get_all_transactions(self) -> List[TransactionWithAccount]:
@@ -58,7 +58,7 @@ class TransactionService:
             return [TransactionWithAccount(**row) for row in result]
             
         except Exception as e:
-            logger.error(f"Ошибка получения транзакций: {e}")
+            logger.error("Ошибка получения транзакций: %s", e)
             raise
     
     async def get_transactions_by_account(self, account_id: int) -> List[TransactionWithAccount]:
@@ -77,7 +77,7 @@ class TransactionService:
             return [TransactionWithAccount(**row) for row in result]
             
         except Exception as e:
-            logger.error(f"Ошибка получения транзакций по счету: {e}")
+            logger.error("Ошибка получения транзакций по счету: %s", e)
             raise
     
     async def get_summary_statistics(self) -> Dict[str, Any]:
@@ -106,7 +106,7 @@ class TransactionService:
             }
             
         except Exception as e:
-            logger.error(f"Ошибка получения статистики: {e}")
+            logger.error("Ошибка получения статистики: %s", e)
             raise
     
     async def get_categories(self) -> List[Dict[str, Any]]:
@@ -124,7 +124,7 @@ class TransactionService:
             return result
             
         except Exception as e:
-            logger.error(f"Ошибка получения категорий: {e}")
+            logger.error("Ошибка получения категорий: %s", e)
             raise
     
     async def get_transactions_report(self, start_date: str = None, end_date: str = None) -> Dict[str, Any]:
@@ -161,7 +161,7 @@ class TransactionService:
             return {"transactions_report": result}
             
         except Exception as e:
-            logger.error(f"Ошибка получения отчета по транзакциям: {e}")
+            logger.error("Ошибка получения отчета по транзакциям: %s", e)
             raise
 
 
@@ -0,0 +1,30 @@
+"""
+Общие настройки тестов backend: пакет app импортируется из каталога backend
+
+app.models.database при импорте требует .env в корне репозитория и
+DATABASE_URL, а цепочка app.banks -> app.services -> app.models.database
+тянет его в каждый тест. Тесты к базе не подключаются, поэтому модуль
+заменяется заглушкой до первого импорта app.
+"""
+
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class _TestDatabase:
+    """Заменитель Database: любое обращение к базе в тестах - ошибка"""
+
+    def __init__(self, connection_string: str = 'postgresql://test'):
+        self.connection_string = connection_string
+
+    def __getattr__(self, name):
+        raise RuntimeError(f"Тесты не подключаются к базе данных (Database.{name})")
+
+
+_database_module = types.ModuleType('app.models.database')
+_database_module.Database = _TestDatabase
+_database_module.db = _TestDatabase()
+sys.modules['app.models.database'] = _database_module
@@ -0,0 +1,49 @@
+"""
+Тесты правил TransactionCategorizer
+"""
+
+import asyncio
+
+from app.ai.categorizer import TransactionCategorizer
+
+
+def test_custom_category_keeps_inline_flags_of_patterns():
+    categorizer = TransactionCategorizer()
+    categorizer.add_custom_category("Pets", [], [r'(?i)vet\w*', r'pet ?smart'])
+    
+    category = asyncio.run(categorizer.categorize_transaction({'description': 'VETCLINIC', 'amount': -80.0}))
+    
+    assert category == "Pets"
+
+
+def test_custom_category_keeps_backreference_numbers():
+    categorizer = TransactionCategorizer()
+    categorizer.add_custom_category("Повторы", [], [r'(zz)\1', r'(ab)-\1'])
+    
+    category = asyncio.run(categorizer.categorize_transaction({'description': 'ab-ab', 'amount': -5.0}))
+    
+    assert category == "Повторы"
+
+
+def test_invalid_custom_category_leaves_rules_unchanged():
+    categorizer = TransactionCategorizer()
+    categorizer.add_custom_category("Сломанная", ["broken"], [r'(unclosed'])
+    
+    assert "Сломанная" not in categorizer.get_available_categories()
+    category = asyncio.run(categorizer.categorize_transaction({'description': 'broken', 'amount': -1.0}))
+    assert category == "Другое"
+
+
+def test_batch_and_single_categorization_agree():
+    categorizer = TransactionCategorizer()
+    transactions = [
+        {'description': 'Netflix', 'amount': -15.0},
+        {'description': 'Netflix refund', 'amount': 15.0},
+        {'description': 'Unknown', 'amount': -1.0},
+    ]
+    
+    single = [asyncio.run(categorizer.categorize_transaction(dict(t))) for t in transactions]
+    batch = asyncio.run(categorizer.categorize_batch([dict(t) for t in transactions]))
+    
+    assert single == ["Развлечения", "Доходы", "Другое"]
+    assert [t['category'] for t in batch] == single
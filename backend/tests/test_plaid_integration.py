@@ -0,0 +1,335 @@
+"""
+Тесты PlaidBankConnector без обращения к Plaid: SDK-клиент подменяется заглушкой
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("plaid")
+
+import urllib3
+
+from app.banks import plaid_integration
+from app.banks.plaid_integration import PlaidBankConnector
+from app.services.cache_service import PlaidCacheService
+
+CREDENTIALS = {
+    'client_id': 'test-client',
+    'secret': 'test-secret',
+    'environment': 'sandbox',
+    'access_token': 'access-sandbox-test',
+    'item_id': 'item-test',
+    'bank_name': 'Test Bank',
+    'bank_code': 'TEST',
+}
+
+
+def _plaid_transaction(transaction_id, account_id, amount):
+    return {
+        'transaction_id': transaction_id,
+        'account_id': account_id,
+        'amount': amount,
+        'name': f"Покупка {transaction_id}",
+        'date': '2026-10-01',
+        'category': ['Shops'],
+        'iso_currency_code': 'CAD',
+    }
+
+
+class FakePlaidClient:
+    """Заглушка PlaidApi: отдает заранее заданные ответы transactions_sync и accounts_get"""
+    
+    def __init__(self, sync_pages, accounts=None, accounts_error=None):
+        self.sync_pages = list(sync_pages)
+        self.sync_requests = []
+        self.accounts = accounts or []
+        self.accounts_error = accounts_error
+        self.accounts_calls = 0
+    
+    def transactions_sync(self, request, **kwargs):
+        self.sync_requests.append(request)
+        return self.sync_pages.pop(0)
+    
+    def accounts_get(self, request, **kwargs):
+        self.accounts_calls += 1
+        if self.accounts_error is not None:
+            raise self.accounts_error
+        return {'accounts': self.accounts}
+
+
+@pytest.fixture
+def connector_factory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(plaid_integration, '_global_monthly_cache', plaid_integration.Counter())
+    monkeypatch.setattr(plaid_integration, '_global_request_count', 0)
+    monkeypatch.setattr(plaid_integration, '_request_count_restored', False)
+    monkeypatch.setattr(plaid_integration, '_shared_cache', {})
+    monkeypatch.setattr(plaid_integration, '_plaid_breaker_failures', 0)
+    monkeypatch.setattr(plaid_integration, '_plaid_breaker_open_until', 0.0)
+    monkeypatch.setattr(plaid_integration, '_PLAID_BACKOFF_MAX', 0.0)
+    
+    def factory(client):
+        connector = PlaidBankConnector(dict(CREDENTIALS))
+        connector.client = client
+        connector.cache_service = PlaidCacheService(cache_dir=str(tmp_path / 'cache'))
+        connector.is_connected = True
+        return connector
+    
+    return factory
+
+
+def test_incremental_sync_returns_rows_and_defers_other_accounts(connector_factory):
+    client = FakePlaidClient([
+        {
+            'added': [
+                _plaid_transaction('tx-1', 'acc-1', 12.5),
+                _plaid_transaction('tx-2', 'acc-2', 40.0),
+            ],
+            'next_cursor': 'cursor-1',
+            'has_more': True,
+        },
+        {
+            'added': [_plaid_transaction('tx-3', 'acc-1', 3.0)],
+            'next_cursor': 'cursor-2',
+            'has_more': False,
+        },
+    ])
+    
+    async def scenario():
+        connector = connector_factory(client)
+        first = await connector.get_incremental_transactions('acc-1', last_update=None)
+        cursor = await connector.cache_service.get_cached_data(data_type='tx_cursor', item_id='item-test')
+        
+        # Транзакции второго счета отложены и отдаются при его запросе без нового курсора
+        client.sync_pages.append({'added': [], 'next_cursor': 'cursor-2', 'has_more': False})
+        other = await connector.get_incremental_transactions('acc-2', last_update=None)
+        return first, cursor, other
+    
+    first, cursor, other = asyncio.run(scenario())
+    
+    assert [row['id'] for row in first] == ['tx-1', 'tx-3']
+    assert first[0] == {
+        'id': 'tx-1', 'amount': 12.5, 'name': 'Покупка tx-1', 'date': '2026-10-01',
+        'category': ['Shops'], 'account_id': 'acc-1', 'currency': 'CAD',
+    }
+    assert cursor['data'] == 'cursor-2'
+    assert [row['id'] for row in other] == ['tx-2']
+    assert client.sync_requests[-1]['cursor'] == 'cursor-2'
+
+
+def test_request_count_restored_once_and_not_reset_by_new_connectors(connector_factory):
+    month_key = f"requests_{plaid_integration._current_month()}"
+    
+    async def scenario():
+        first = connector_factory(FakePlaidClient([]))
+        await first.cache_service.cache_data("plaid_request_count", {
+            'monthly_requests': {month_key: 4},
+            'total_requests': 9,
+        })
+        
+        await first._increment_request_count()
+        # Каждый HTTP-запрос создает новый коннектор - счетчик не должен сбрасываться
+        second = connector_factory(FakePlaidClient([]))
+        await second._check_rate_limit()
+        await second._increment_request_count()
+        
+        stored = await second.cache_service.get_cached_data("plaid_request_count")
+        return stored['data']
+    
+    stored = asyncio.run(scenario())
+    
+    assert plaid_integration._global_monthly_cache[month_key] == 6
+    assert plaid_integration._global_request_count == 11
+    assert stored['monthly_requests'][month_key] == 6
+
+
+def test_incremental_sync_keeps_cursor_when_pending_write_fails(connector_factory, monkeypatch):
+    page = {
+        'added': [
+            _plaid_transaction('tx-1', 'acc-1', 12.5),
+            _plaid_transaction('tx-2', 'acc-2', 40.0),
+        ],
+        'next_cursor': 'cursor-1',
+        'has_more': False,
+    }
+    client = FakePlaidClient([page, page])
+    
+    async def scenario():
+        connector = connector_factory(client)
+        cache_service = connector.cache_service
+        real_cache_data = cache_service.cache_data
+        
+        async def failing_cache_data(data_type, *args, **kwargs):
+            if data_type == 'tx_sync_pending':
+                return False
+            return await real_cache_data(data_type, *args, **kwargs)
+        
+        monkeypatch.setattr(cache_service, 'cache_data', failing_cache_data)
+        failed = await connector.get_incremental_transactions('acc-1', last_update=None)
+        cursor_after_failure = await cache_service.get_cached_data(data_type='tx_cursor', item_id='item-test')
+        
+        monkeypatch.setattr(cache_service, 'cache_data', real_cache_data)
+        retried = await connector.get_incremental_transactions('acc-1', last_update=None)
+        other_pending = await cache_service.get_cached_data(
+            data_type='tx_sync_pending', bank_code='TEST', account_id='acc-2', item_id='item-test'
+        )
+        return failed, cursor_after_failure, retried, other_pending
+    
+    failed, cursor_after_failure, retried, other_pending = asyncio.run(scenario())
+    
+    assert failed == []
+    assert cursor_after_failure is None
+    # Повторный sync начинается с того же места и ничего не теряет
+    assert 'cursor' not in client.sync_requests[1]
+    assert [row['id'] for row in retried] == ['tx-1']
+    assert [row['id'] for row in other_pending['data']] == ['tx-2']
+
+
+
+def test_incremental_sync_stops_at_rate_limit_without_saving_cursor(connector_factory):
+    client = FakePlaidClient([
+        {
+            'added': [_plaid_transaction('tx-1', 'acc-1', 12.5)],
+            'next_cursor': 'cursor-1',
+            'has_more': True,
+        },
+    ])
+    
+    async def scenario():
+        connector = connector_factory(client)
+        await connector.cache_service.cache_data(
+            data_type='tx_sync_pending', data=[{'id': 'tx-0', 'account_id': 'acc-1'}],
+            bank_code='TEST', account_id='acc-1', item_id='item-test'
+        )
+        # Лимит заканчивается после первой страницы
+        connector.monthly_limit = 1
+        first = await connector.get_incremental_transactions('acc-1')
+        cursor = await connector.cache_service.get_cached_data(data_type='tx_cursor', item_id='item-test')
+        second = await connector.get_incremental_transactions('acc-1')
+        return first, cursor, second
+    
+    first, cursor, second = asyncio.run(scenario())
+    
+    assert [row['id'] for row in first] == ['tx-0']
+    assert cursor is None
+    assert second == []
+    assert len(client.sync_requests) == 1
+
+
+def test_incremental_sync_rolls_back_when_cursor_write_fails(connector_factory, monkeypatch):
+    page = {
+        'added': [
+            _plaid_transaction('tx-1', 'acc-1', 12.5),
+            _plaid_transaction('tx-2', 'acc-2', 40.0),
+        ],
+        'next_cursor': 'cursor-1',
+        'has_more': False,
+    }
+    client = FakePlaidClient([page, page, {'added': [], 'next_cursor': 'cursor-1', 'has_more': False}])
+    
+    async def scenario():
+        connector = connector_factory(client)
+        cache_service = connector.cache_service
+        real_cache_data = cache_service.cache_data
+        
+        async def failing_cache_data(data_type, *args, **kwargs):
+            if data_type == 'tx_cursor':
+                return False
+            return await real_cache_data(data_type, *args, **kwargs)
+        
+        monkeypatch.setattr(cache_service, 'cache_data', failing_cache_data)
+        failed = await connector.get_incremental_transactions('acc-1')
+        pending_after_failure = await cache_service.get_cached_data(
+            data_type='tx_sync_pending', bank_code='TEST', account_id='acc-2', item_id='item-test'
+        )
+        
+        monkeypatch.setattr(cache_service, 'cache_data', real_cache_data)
+        retried = await connector.get_incremental_transactions('acc-1')
+        other = await connector.get_incremental_transactions('acc-2')
+        return failed, pending_after_failure, retried, other
+    
+    failed, pending_after_failure, retried, other = asyncio.run(scenario())
+    
+    # Транзакции отдаются ровно один раз - после успешного сохранения курсора
+    assert failed == []
+    assert pending_after_failure['data'] == []
+    assert [row['id'] for row in retried] == ['tx-1']
+    assert [row['id'] for row in other] == ['tx-2']
+
+
+def _plaid_account(account_id, current):
+    return {
+        'account_id': account_id,
+        'balances': {'current': current, 'available': current, 'iso_currency_code': 'CAD'},
+    }
+
+
+def test_get_balances_uses_one_accounts_get(connector_factory):
+    client = FakePlaidClient([], accounts=[_plaid_account('acc-1', 100.0), _plaid_account('acc-2', 5.0)])
+    
+    async def scenario():
+        connector = connector_factory(client)
+        return await connector.get_balances(['acc-1', 'acc-2', 'acc-unknown'])
+    
+    balances = asyncio.run(scenario())
+    
+    assert client.accounts_calls == 1
+    assert balances['acc-1']['current_balance'] == 100.0
+    assert balances['acc-2']['current_balance'] == 5.0
+    assert balances['acc-unknown'] == {}
+
+
+def test_get_balances_retries_once_for_all_ids_when_plaid_fails(connector_factory):
+    client = FakePlaidClient([], accounts_error=urllib3.exceptions.ProtocolError("connection reset"))
+    
+    async def scenario():
+        connector = connector_factory(client)
+        return await connector.get_balances(['acc-1', 'acc-2', 'acc-3'])
+    
+    balances = asyncio.run(scenario())
+    
+    assert client.accounts_calls == plaid_integration._PLAID_MAX_ATTEMPTS
+    assert balances == {'acc-1': {}, 'acc-2': {}, 'acc-3': {}}
+
+
+def test_rate_limit_status_ignores_previous_month(connector_factory, monkeypatch):
+    async def scenario():
+        connector = connector_factory(FakePlaidClient([]))
+        await connector.cache_service.cache_data("plaid_request_count", {
+            'monthly_requests': {'requests_2000-01': 97},
+            'total_requests': 97,
+        })
+        
+        async def available():
+            return True
+        
+        monkeypatch.setattr(connector, '_check_plaid_availability', available)
+        return await connector.get_rate_limit_status()
+    
+    status = asyncio.run(scenario())
+    
+    assert status['requests_used'] == 0
+    assert status['requests_remaining'] == status['monthly_limit']
+
+
+def test_rate_limit_status_without_probe_does_not_call_plaid(connector_factory, monkeypatch):
+    month_key = f"requests_{plaid_integration._current_month()}"
+    
+    async def scenario():
+        connector = connector_factory(FakePlaidClient([]))
+        await connector.cache_service.cache_data("plaid_request_count", {
+            'monthly_requests': {month_key: 7},
+            'total_requests': 7,
+        })
+        
+        async def unexpected_probe():
+            raise AssertionError("Plaid не должен вызываться")
+        
+        monkeypatch.setattr(connector, '_check_plaid_availability', unexpected_probe)
+        return await connector.get_rate_limit_status(probe=False)
+    
+    status = asyncio.run(scenario())
+    
+    assert status['requests_used'] == 7
+    assert status['plaid_available'] is None